@@ -0,0 +1,85 @@
+"""
+Per-row cost of reading the sheet cell by cell vs in blocks
+
+Reads the date, comment and work cells of every date row of a synthetic
+sheet the way the commands used to, openpyxl `sheet.cell(row, column).value`
+on a workbook loaded in full (ten calls per row), and through Sheet.block /
+Sheet.records, and prints the time per row. Both are timed with and without
+opening the file: cold blocks come from openpyxl in read-only mode, warm ones
+from the snapshot.
+
+Usage:
+    python benchmarks/block_read.py [--years 1 5] [--runs 5]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from suite import median_ms
+from synthetic import generate, workbook_path
+
+
+def per_cell(sheet, columns, first_row, last_row):
+    return [[sheet.cell(row=row, column=column).value for column in columns] for row in range(first_row, last_row + 1)]
+
+
+def bench(runs: int):
+    """Run in a process whose $HOME holds the synthetic sheet"""
+    import openpyxl as xl
+
+    from clock.utils.file import CACHE_DIR, EXCEL_FILE
+    from clock.utils.sheet import SheetReader
+
+    def cold():
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    cold()
+    s = SheetReader()
+    first_row, last_row = s.DATE_ROW_FIRST, s.max_row
+    n = last_row - first_row + 1
+    columns = [s.DATE_COLUMN, s.COMMENT_COLUMN] + [work_cols[key] for work_cols in s.WORK_COLUMNS for key in ("start", "end")]
+
+    def baseline():
+        sheet = xl.load_workbook(EXCEL_FILE)[s.SHEET_NAME]
+        return per_cell(sheet, columns, first_row, last_row)
+
+    sheet = xl.load_workbook(EXCEL_FILE)[s.SHEET_NAME]
+    results = {
+        "before  load_workbook + cell() per cell": median_ms(baseline, runs),
+        "before  cell() per cell, loaded": median_ms(lambda: per_cell(sheet, columns, first_row, last_row), runs),
+        "after   cold open + block()": median_ms(lambda: SheetReader().block(first_row, last_row), runs, setup=cold),
+        "after   warm open + block()": median_ms(lambda: SheetReader().block(first_row, last_row), runs),
+        "after   block(), loaded": median_ms(lambda: s.block(first_row, last_row), runs),
+        "after   records(), loaded": median_ms(lambda: s.records(first_row, last_row), runs),
+    }
+    for label, ms in results.items():
+        print(f"  {label:<40} {ms * 1000 / n:8.2f} us/row  ({n} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5], help="Sheet sizes in years of rows (default: 1 5)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement, the median is kept (default: 5)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        bench(args.runs)
+        return
+
+    for years in args.years:
+        print(f"{years} year(s) of rows")
+        with tempfile.TemporaryDirectory() as home:
+            generate(workbook_path(Path(home), date.today().year), date.today().year, years=years)
+            env = {key: value for key, value in os.environ.items() if not key.startswith("CLOCK_")}
+            env["HOME"] = home
+            subprocess.run([sys.executable, __file__, "--worker", "--runs", str(args.runs)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Startup time benchmark
+
+Measures how long `import clock.main` takes (through python -X importtime)
+and how long a few cheap invocations take end to end, and fails if they go
+over budget or if a heavy dependency is imported at startup. `clock status`
+runs in shell prompts, so it has its own budget: its wall time over a bare
+`python -c pass`, with a fresh status file in a scratch $HOME. Both are run
+in turns and the fastest run of each is compared, so that a busy machine
+does not make the check fail.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--import-budget 60] [--status-budget 15] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Modules that must not be imported just to build the command line parser
+HEAVY = ["openpyxl", "rich", "tabulate"]
+
+INVOCATIONS = {
+    "--help": "import sys; sys.argv = ['clock', '--help']\ntry:\n    from clock.main import main; main()\nexcept SystemExit:\n    pass",
+    "helloworld": "import sys; sys.argv = ['clock', 'helloworld']\ntry:\n    from clock.main import main; main()\nexcept SystemExit:\n    pass",
+}
+
+STATUS = "import sys; sys.argv = ['clock', 'status']\ntry:\n    from clock.main import main; main()\nexcept SystemExit:\n    pass"
+
+
+def import_time(code="import clock.main", env=None):
+    """Return (cumulative microseconds of clock.main, set of imported top level modules)"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, env=env,
+    ).stderr
+
+    total = None
+    modules = set()
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        modules.add(name.split(".")[0])
+        if name == "clock.main":
+            total = int(cumulative)
+    return total, modules
+
+
+def run_ms(code, env=None) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], capture_output=True, check=True, env=env)
+    return (time.perf_counter() - t0) * 1000
+
+
+def wall_time(code, runs, env=None):
+    return statistics.median(run_ms(code, env) for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Runs per invocation (default: 10)")
+    parser.add_argument("--import-budget", type=float, default=60, help="Budget for import clock.main in ms (default: 60)")
+    parser.add_argument("--status-budget", type=float, default=15, help="Budget for clock status over python -c pass in ms (default: 15)")
+    parser.add_argument("--json", action="store_true", help="Print the results as json")
+    args = parser.parse_args()
+
+    results = {}
+    failures = []
+
+    # Median over a few runs, the first one also warms up the bytecode cache
+    samples = [import_time() for _ in range(max(args.runs // 2, 1))]
+    results["import clock.main"] = statistics.median(s[0] for s in samples) / 1000
+    if results["import clock.main"] > args.import_budget:
+        failures.append(f"import clock.main took {results['import clock.main']:.1f} ms (budget {args.import_budget} ms)")
+
+    heavy = sorted(set(HEAVY) & samples[-1][1])
+    if heavy:
+        failures.append(f"import clock.main imports {', '.join(heavy)}")
+
+    baseline = wall_time("pass", args.runs)
+    results["python -c pass"] = baseline
+    for name, code in INVOCATIONS.items():
+        results[f"clock {name}"] = wall_time(code, args.runs)
+
+    with tempfile.TemporaryDirectory() as home:
+        env = {key: value for key, value in os.environ.items() if not key.startswith("CLOCK_")}
+        env["HOME"] = home
+        # A fresh status file (there is no workbook, which the file records as such)
+        subprocess.run([sys.executable, "-c", "from clock.utils import status; status.write([(540, 750), (780, -1)], 4)"], env=env, check=True)
+
+        # Noise only ever adds time: the best of alternating runs is what the code costs
+        times = [(run_ms("pass", env), run_ms(STATUS, env)) for _ in range(args.runs)]
+        results["clock status"] = statistics.median(status for _, status in times)
+        overhead = min(status for _, status in times) - min(bare for bare, _ in times)
+        results["clock status - pass"] = overhead
+        if overhead > args.status_budget:
+            failures.append(f"clock status took {overhead:.1f} ms over python -c pass (budget {args.status_budget} ms)")
+        heavy = sorted(set(HEAVY) & import_time(STATUS, env)[1])
+        if heavy:
+            failures.append(f"clock status imports {', '.join(heavy)}")
+
+    if args.json:
+        print(json.dumps({"results_ms": results, "failures": failures}, indent=2))
+    else:
+        for name, ms in results.items():
+            print(f"{name:<24} {ms:8.1f} ms")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
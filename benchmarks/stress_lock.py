@@ -0,0 +1,95 @@
+"""
+Concurrent writers stress test
+
+Runs many `clock` processes at the same time against one synthetic sheet,
+each writing a different day, and checks that no edit got lost and that
+the workbook is still readable. Then runs several `clock in` on the same
+day at once: exactly one of them may clock in, the others have to fail.
+
+Usage:
+    python benchmarks/stress_lock.py [--workers 24] [--same-row 6]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, time as dtime, timedelta
+from pathlib import Path
+
+from synthetic import generate, workbook_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=24, help="Number of parallel invocations (default: 24)")
+    parser.add_argument("--same-row", type=int, default=6, help="Number of parallel clock in on one day (default: 6)")
+    args = parser.parse_args()
+
+    today = date.today()
+    with tempfile.TemporaryDirectory() as home:
+        home = Path(home)
+        path = workbook_path(home, today.year)
+        # Leave the sheet empty so that every write is visible
+        generate(path, today.year, fill_until=date(today.year, 1, 1))
+
+        env = dict(os.environ, HOME=str(home))
+        days = [date(today.year, 1, 1) + timedelta(days=i) for i in range(args.workers)]
+        commands = []
+        for i, day in enumerate(days):
+            if i % 2:
+                # Half of them through clock set ...
+                commands.append(["set", "-d", str(day.day), "-m", str(day.month), "-t", "08:00", f"{9 + i % 8:02d}:00"])
+            else:
+                # ... and half through clock in, as a login hook would
+                commands.append(["in", "-d", str((day - today).days)])
+
+        t0 = time.perf_counter()
+        processes = [
+            subprocess.Popen([sys.executable, "-c", "from clock.main import main; main()", *command],
+                             env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            for command in commands
+        ]
+        errors = [p.stderr.read().decode() for p in processes if p.wait() != 0]
+        elapsed = time.perf_counter() - t0
+
+        # All of them read the same empty day, only the first one to get the lock may write it
+        same_day = days[-1] + timedelta(days=1)
+        processes = [
+            subprocess.Popen([sys.executable, "-c", "from clock.main import main; main()", "in", "-d", str((same_day - today).days)],
+                             env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            for _ in range(args.same_row)
+        ]
+        outputs = [p.communicate() for p in processes]
+        clocked_in = sum(b"Clocked in" in stdout for stdout, _ in outputs)
+        refused = sum(b"Clock out first" in stdout + stderr for stdout, stderr in outputs)
+
+        import openpyxl as xl
+        sheet = xl.load_workbook(path)["Time Recording"]
+        rows = {
+            row[3].value.date(): row for row in sheet.iter_rows(min_row=6)
+            if row[3].value is not None
+        }
+        lost = []
+        for i, (day, command) in enumerate(zip(days, commands)):
+            start, end = rows[day][6].value, rows[day][7].value
+            expected_end = dtime(9 + i % 8, 0) if command[0] == "set" else None
+            if start is None or (command[0] == "set" and (start != dtime(8, 0) or end != expected_end)):
+                lost.append(day)
+        filled = sum(cell.value is not None for cell in rows[same_day][6:14])
+
+    print(f"{args.workers} writers in {elapsed:.2f} s, {len(lost)} lost edits, {len(errors)} failed processes")
+    print(f"{args.same_row} clock in on {same_day}: {clocked_in} clocked in, {refused} refused, {filled} cells written")
+    for error in errors:
+        print(error)
+    for day in lost:
+        print(f"FAIL: edit of {day} lost")
+    same_row_ok = clocked_in == 1 and filled == 1 and refused == args.same_row - 1
+    if not same_row_ok:
+        print(f"FAIL: {clocked_in} of the clock in on {same_day} claim success for {filled} written cells")
+    sys.exit(1 if lost or errors or not same_row_ok else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark suite
+
+Times the Sheet methods in isolation and the subcommands end to end on
+synthetic sheets of several sizes (1 year of rows is the real size, more
+years give bigger files), and records the results as json so that two
+versions can be compared.
+
+Usage:
+    python benchmarks/suite.py [--years 1 5 20] [--runs 5] [--output results.json]
+    python benchmarks/suite.py --compare baseline.json [--tolerance 1.25]
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime, time as dtime
+from importlib import metadata
+from pathlib import Path
+
+from synthetic import generate, workbook_path
+
+# Run in this order on today's row, each run leaves the row as it found it
+COMMANDS = [
+    ["in", "-o", "-1"],
+    ["out"],
+    ["print"],
+    ["clear"],
+    ["set", "-d", str(date.today().day), "-m", str(date.today().month), "-t", "09:00", "17:00"],
+    ["clear"],
+    ["check"],
+]
+
+
+def median_ms(function, runs, setup=None) -> float:
+    times = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def bench_methods(runs: int) -> dict:
+    """Time the Sheet methods, in a process whose $HOME is the synthetic one"""
+    from clock.utils.file import CACHE_DIR
+    from clock.utils.sheet import Sheet, SheetReader
+
+    results = {}
+    results["SheetReader() cold"] = median_ms(SheetReader, runs, setup=lambda: shutil.rmtree(CACHE_DIR, ignore_errors=True))
+    results["SheetReader() warm"] = median_ms(SheetReader, runs)
+    results["Sheet() warm"] = median_ms(Sheet, runs)
+
+    s = SheetReader()
+    days = [s.value(row, s.DATE_COLUMN).date() for row in range(s.DATE_ROW_FIRST, s.max_row + 1)
+            if isinstance(s.value(row, s.DATE_COLUMN), datetime)]
+    rows = [s.index.lookup(day) for day in days]
+
+    results["date_to_row (per call)"] = median_ms(lambda: [s.date_to_row(day) for day in days], runs) / len(days)
+    results["get_work_hours (per row)"] = median_ms(lambda: [s.get_work_hours(row) for row in rows], runs) / len(rows)
+    results["records (per row)"] = median_ms(lambda: s.records(rows[0], rows[-1]), runs) / len(rows)
+    with redirect_stdout(io.StringIO()):
+        results["print_row"] = median_ms(lambda: s.print_row(rows[0]), runs)
+
+    # Write one cell back and forth, the sheet is constructed outside of the timing
+    row = s.date_to_row(date.today())
+    column = s.WORK_COLUMNS[-1]["start"]
+    values = iter([dtime(8, 0), None] * runs)
+    sheets = []
+
+    def setup():
+        sheets.append(Sheet())
+        sheets[-1].set_value(row, column, next(values))
+
+    results["save() one cell"] = median_ms(lambda: sheets[-1].save(), runs, setup=setup)
+    return results
+
+
+def bench_commands(env: dict, runs: int) -> dict:
+    # Start from warm caches like everyday use
+    subprocess.run([sys.executable, "-c", "from clock.main import main; main()", "print"], env=env, capture_output=True, check=True)
+
+    times = {command[0]: [] for command in COMMANDS}
+    for _ in range(runs):
+        for command in COMMANDS:
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "from clock.main import main; main()", *command],
+                           env=env, capture_output=True, check=True)
+            times[command[0]].append((time.perf_counter() - t0) * 1000)
+    return {f"clock {name}": statistics.median(samples) for name, samples in times.items()}
+
+
+def run_size(years: int, runs: int) -> dict:
+    today = date.today()
+    with tempfile.TemporaryDirectory() as home:
+        home = Path(home)
+        path = workbook_path(home, today.year)
+        generate(path, today.year, years=years)
+
+        # Nothing from the real setup (config, daemon, journal) may leak in
+        env = {key: value for key, value in os.environ.items() if not key.startswith("CLOCK_")}
+        env["HOME"] = str(home)
+
+        worker = subprocess.run([sys.executable, __file__, "--worker", "--runs", str(runs)],
+                                env=env, capture_output=True, text=True, check=True)
+        return {
+            "file_kb": path.stat().st_size / 1024,
+            "methods_ms": json.loads(worker.stdout),
+            "commands_ms": bench_commands(env, runs),
+        }
+
+
+def compare(baseline: dict, results: dict, tolerance: float) -> list:
+    """Print old vs new for every measurement in both, return the regressions"""
+    regressions = []
+    for size, new in results["sizes"].items():
+        old = baseline["sizes"].get(size)
+        if old is None:
+            continue
+        for group in ("methods_ms", "commands_ms"):
+            for name, ms in new[group].items():
+                if name not in old[group]:
+                    continue
+                ratio = ms / old[group][name] if old[group][name] else float("inf")
+                flag = ""
+                if ratio > tolerance:
+                    flag = "  REGRESSION"
+                    regressions.append(f"{size} {name}")
+                print(f"{size:>4} {name:<28} {old[group][name]:10.3f} -> {ms:10.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20], help="Sheet sizes in years of rows (default: 1 5 20)")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement, the median is kept (default: 5)")
+    parser.add_argument("--output", help="Write the results to this json file")
+    parser.add_argument("--compare", help="json file of a previous run to compare with")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Slowdown ratio reported as regression (default: 1.25)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(bench_methods(args.runs)))
+        return
+
+    results = {
+        "version": metadata.version("desyclock"),
+        "python": platform.python_version(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "runs": args.runs,
+        "sizes": {},
+    }
+    for years in args.years:
+        print(f"Benchmarking {years} year(s) of rows ...", file=sys.stderr)
+        results["sizes"][f"{years}y"] = run_size(years, args.runs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+    if not args.output:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
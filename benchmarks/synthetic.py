@@ -0,0 +1,104 @@
+"""
+Synthetic time sheets for the benchmarks
+
+Builds a workbook with the same layout Sheet expects: an info sheet, a
+header block and a `Time Recording` sheet with one row per day, month
+names and a few holidays in the comment column, and work times filled in
+for the working days before a given date. A sheet can span several years
+to get bigger files than the real ones.
+
+Usage:
+    python benchmarks/synthetic.py OUTPUT.xlsx [--year 2026] [--years 1] [--seed 0]
+"""
+import argparse
+import random
+from datetime import date, timedelta
+
+from clock.utils.random import generate_day_times
+
+MONTHS = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+]
+HOLIDAYS = {(1, 1): "New Year", (5, 1): "Labour Day", (10, 3): "German Unity Day", (12, 25): "Christmas", (12, 26): "Christmas"}
+
+HEADER_ROW = 5
+DATE_COLUMN = 4
+COMMENT_COLUMN = 6
+WORK_COLUMNS = [(7, 8), (9, 10), (11, 12), (13, 14)]
+TOTAL_COLUMN = 15
+
+
+def workbook_path(home, year: int):
+    """Where clock looks for the sheet of year when $HOME is home"""
+    return home / f"Zeiterfassungstabelle {year} Doktorand_innen.xlsx"
+
+
+def generate(path, year: int, fill_until: date = None, years: int = 1, seed: int = 0):
+    """
+    Write a synthetic time sheet for year to path.
+
+    Parameters:
+    path - output xlsx file
+    year - calendar year of the last rows
+    fill_until - working days before this date get a morning and an afternoon block (default: today)
+    years - number of years of rows, ending with year
+    seed - seed of the random work times, the same arguments always give the same sheet
+    """
+    import openpyxl as xl
+
+    fill_until = fill_until or date.today()
+    rng_state = random.getstate()
+    random.seed(seed)
+
+    workbook = xl.Workbook()
+    info = workbook.active
+    info.title = "Info"
+    info["A1"] = "Synthetic time sheet"
+
+    sheet = workbook.create_sheet("Time Recording")
+    sheet["A1"] = f"Zeiterfassung {year}"
+    sheet["D3"] = "Name: Benchmark"
+    headers = ["Date", "Day", "Comments"] + ["Start", "End"] * len(WORK_COLUMNS) + ["Total"]
+    for column, header in enumerate(headers, start=DATE_COLUMN):
+        sheet.cell(row=HEADER_ROW, column=column, value=header)
+
+    row = HEADER_ROW + 1
+    day = date(year - years + 1, 1, 1)
+    while day.year <= year:
+        sheet.cell(row=row, column=DATE_COLUMN, value=day).number_format = "DD.MM.YYYY"
+        sheet.cell(row=row, column=DATE_COLUMN + 1, value=day.strftime("%a"))
+
+        comment = HOLIDAYS.get((day.month, day.day)) or (MONTHS[day.month - 1] if day.day == 1 else None)
+        sheet.cell(row=row, column=COMMENT_COLUMN, value=comment)
+
+        for start, end in WORK_COLUMNS:
+            sheet.cell(row=row, column=start).number_format = "hh:mm"
+            sheet.cell(row=row, column=end).number_format = "hh:mm"
+        sheet.cell(row=row, column=TOTAL_COLUMN, value=f"=H{row}-G{row}+J{row}-I{row}+L{row}-K{row}+N{row}-M{row}")
+
+        if day < fill_until and day.weekday() < 5 and (day.month, day.day) not in HOLIDAYS:
+            arrival, lunch_start, lunch_end, leave = generate_day_times()
+            for (start, end), (t0, t1) in zip(WORK_COLUMNS, [(arrival, lunch_start), (lunch_end, leave)]):
+                sheet.cell(row=row, column=start).value = t0
+                sheet.cell(row=row, column=end).value = t1
+
+        day += timedelta(days=1)
+        row += 1
+
+    random.setstate(rng_state)
+    workbook.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output")
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--years", type=int, default=1, help="Years of rows, ending with --year (default: 1)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate(args.output, args.year, years=args.years, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
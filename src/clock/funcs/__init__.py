@@ -1,3 +1,22 @@
-from . import check, clear, clockin, clockout, helloworld, printrow, random, setrow
+"""
+Subcommand handlers
 
-__all__ = ["helloworld", "clockin", "clockout", "printrow", "check", "clear", "setrow", "random"]
\ No newline at end of file
+The modules are imported only when their subcommand runs, so that e.g.
+`clock helloworld` or `clock --help` do not pay for openpyxl and friends.
+"""
+from importlib import import_module
+
+__all__ = ["helloworld", "clockin", "clockout", "printrow", "check", "clear", "setrow", "random", "serve", "sync", "history", "report", "importer", "export", "team", "status"]
+
+
+def handler(module: str):
+    """Return a function running funcs.<module>.main, importing the module on first call"""
+    def main(args):
+        from ..utils import profiling
+
+        with profiling.phase("import"):
+            command = import_module(f".{module}", __name__)
+        return command.main(args)
+
+    main.__qualname__ = f"{module}.main"
+    return main
@@ -2,30 +2,43 @@
 Check sanity of the rows from the start of the year to today
 """
 
+import contextlib
+import sys
 from datetime import date
 
-from rich.console import Console
-from rich.live import Live
+from ..utils import profiling
+from ..utils.checker import check_incremental
+from ..utils.diagnostics import Diagnostics
+from ..utils.print import error
+from ..utils.sheet import SheetReader
 
-from ..utils.print import warn
-from ..utils.sheet import Sheet
-from ..utils.time import is_holiday, is_weekend
-
-console = Console()
 
 def main(args):
-    s = Sheet()
+    s = SheetReader()
     today = date.today()
     today_row = s.date_to_row(today)
-
-    with Live(console=console, refresh_per_second=4) as live:
-        for row in range(s.DATE_ROW_FIRST, today_row + 1):
-            date_target = s.sheet.cell(row=row, column=s.DATE_COLUMN).value
-            live.update(f"[green]Checking[/green] {date_target.strftime('%d/%m/%Y')} | Row: {row}")
-
-            total_time, work_hours = s.get_work_hours(row, verbose=True)
-
-            comment = s.sheet.cell(row=row, column=s.COMMENT_COLUMN).value
-            if work_hours and (is_holiday(comment) or is_weekend(date_target)):
-                warn(f"({date_target.strftime('%d/%m/%Y')}) You worked on a holiday or a weekend")
-                # I will allow it but you really shouldn't, go have fun
\ No newline at end of file
+    if not today_row:
+        return 1
+    if not isinstance(s.value(today_row, s.DATE_COLUMN), date):
+        error(f"Row {today_row} has no date in column {s.DATE_COLUMN}, check the sheet layout")
+        return 1
+
+    # The spinner is only for people watching a terminal
+    status = contextlib.nullcontext()
+    if not args.quiet and args.format == "text" and sys.stdout.isatty():
+        from rich.console import Console
+
+        status = Console().status(f"[green]Checking[/green] {s.DATE_ROW_FIRST}-{today_row} rows")
+
+    with status, profiling.phase("check"):
+        # Only the rows that changed since the last check, unless --full
+        findings = check_incremental(s, s.DATE_ROW_FIRST, today_row, full=args.full)
+        # Only the rows with something to say need their date
+        dates = {offset: s.value(s.DATE_ROW_FIRST + offset, s.DATE_COLUMN) for offset, _, _ in findings}
+        diagnostics = Diagnostics(checked=today_row - s.DATE_ROW_FIRST + 1)
+        diagnostics.extend(findings, s.DATE_ROW_FIRST, dates)
+
+    with profiling.phase("render"):
+        diagnostics.render(args.format, plain=args.quiet)
+    # Working on a holiday or weekend is only a warning: I will allow it but you really shouldn't, go have fun
+    return diagnostics.exit_code(args.fail_on)
@@ -3,19 +3,31 @@ Clear the work hours of a day in case you did an oopsie
 """
 from datetime import date, timedelta
 
+from ..utils import journal
 from ..utils.print import success
 from ..utils.sheet import Sheet
+from .sync import sync_if_due
 
 
 def main(args):
-    s = Sheet()
     date_target = date.today() + timedelta(days=args.day)
-    row = s.date_to_row(date_target)
-    
-    for work_column in s.WORK_COLUMNS:
-        # Set them to none
-        s.sheet.cell(row = row, column = work_column["start"]).value = None
-        s.sheet.cell(row = row, column = work_column["end"]).value = None    
-    s.save()
-    
-    success(f"{date_target.strftime('%d/%m/%Y')} cleared")
+
+    # Journal mode: just write it down, `clock sync` applies it later
+    if journal.enabled():
+        journal.append("clear", date_target)
+        success(f"{date_target.strftime('%d/%m/%Y')} cleared (journaled)")
+        sync_if_due()
+        return
+
+    with Sheet.editing() as s:
+        row = s.date_to_row(date_target)
+        if not row:
+            return 1
+
+        for work_column in s.WORK_COLUMNS:
+            # Set them to none
+            s.set_value(row, work_column["start"], None)
+            s.set_value(row, work_column["end"], None)    
+        s.save()
+
+        success(f"{date_target.strftime('%d/%m/%Y')} cleared")
@@ -7,52 +7,46 @@ Args:
 """
 from datetime import date, datetime, timedelta
 
+from ..utils import journal
 from ..utils.print import error, success, warn
+from ..utils.rules import RuleError, clock_in_slot
 from ..utils.sheet import Sheet
 from ..utils.time import is_holiday, is_weekend
+from .sync import sync_if_due
 
 
 def main(args):
-    s = Sheet()
     date_target = date.today() + timedelta(days=args.day)
-    row = s.date_to_row(date_target)
-    comment = s.sheet.cell(row=row, column=s.COMMENT_COLUMN).value
-    
     time = (datetime.now() + timedelta(minutes=args.minutes) + timedelta(hours=args.hours)).time()
 
-    total_time, work_hours = s.get_work_hours(row)
+    # Journal mode: just write it down, `clock sync` checks and saves it later
+    if journal.enabled():
+        journal.append("in", date_target, time)
+        success("Clocked in at " + date_target.strftime('%d/%m/%Y') + " : " + time.strftime('%H:%M') + " (journaled)")
+        sync_if_due()
+        return
 
-    # Bruh, don't
-    if is_weekend(date_target):
-        warn(f"{date_target} is a weekend")
-    if is_holiday(comment):
-        warn(f"{date_target} is a holiday")
+    with Sheet.editing() as s:
+        row = s.date_to_row(date_target)
+        if not row:
+            return 1
+        comment = s.value(row, s.COMMENT_COLUMN)
 
-    # If you have no clocked in today
-    if not work_hours:
-        s.sheet.cell(row = row, column = s.WORK_COLUMNS[0]["start"]).value = time
-        s.save()
-        success("Clocked in at " + date_target.strftime('%d/%m/%Y') + " : " + time.strftime('%H:%M'))
-        return
-    else:
-        # If you have not clocked out
-        if not work_hours[-1]["end"]:
-            error("Clock out first")
-            s.print_row(row)
-            return
-        # If the clock in time is earlier than the last clock out time
-        elif work_hours[-1]["end"] >= time:
-            error("You cannot clock in before last clock out")
+        record = s.get_work_hours(row)
+
+        # Bruh, don't
+        if is_weekend(date_target):
+            warn(f"{date_target} is a weekend")
+        if is_holiday(comment):
+            warn(f"{date_target} is a holiday")
+
+        try:
+            slot = clock_in_slot(record, time, len(s.WORK_COLUMNS))
+        except RuleError as e:
+            error(str(e))
             s.print_row(row)
             return
-        else:
-            # If you run out of slots
-            if len(work_hours) >= len(s.WORK_COLUMNS):
-                error("You cannot clock in and out more than " + str(len(s.WORK_COLUMNS)) + " times a day")
-                s.print_row(row)
-                return
-            else:
-                s.sheet.cell(row = row, column = s.WORK_COLUMNS[len(work_hours)]["start"]).value = time
-                s.save()
-                success("Clocked in at " + date_target.strftime('%d/%m/%Y') + " : " + time.strftime('%H:%M'))
-                return
\ No newline at end of file
+
+        s.set_value(row, s.WORK_COLUMNS[slot]["start"], time)
+        s.save()
+        success("Clocked in at " + date_target.strftime('%d/%m/%Y') + " : " + time.strftime('%H:%M'))
@@ -0,0 +1,116 @@
+"""
+Export the days of the sheet as CSV, JSON Lines or Parquet (with pyarrow)
+
+Rows are streamed one at a time from the snapshot or the workbook and
+written as they come, so memory does not depend on the size of the sheet.
+"""
+import csv
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from ..utils import journal
+from ..utils.day import format_minutes
+from ..utils.print import error, success
+from ..utils.sheet import SheetReader
+from ..utils.time import parse_date
+
+SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+FIELDS = ["date", "comment", "intervals", "total_minutes"]
+PARQUET_BATCH = 4096
+
+
+def records(s, first: date, last: date):
+    """Yield one dict per day from first to last: date, comment, intervals [[start, end]] as HH:MM, total_minutes"""
+    rows = s.index.rows_between(first, last)
+    if not rows:
+        return
+    for row, values in s.iter_rows(min(rows), max(rows)):
+        value = values[s.DATE_COLUMN - 1] if len(values) >= s.DATE_COLUMN else None
+        if not isinstance(value, datetime) or not first <= value.date() <= last:
+            continue
+        record = s.row_work_hours(values)
+        yield {
+            "date": record.date,
+            "comment": values[s.COMMENT_COLUMN - 1] if len(values) >= s.COMMENT_COLUMN else None,
+            "intervals": [[format_minutes(start), format_minutes(end) or None] for start, end in record.intervals],
+            "total_minutes": record.total,
+        }
+
+
+def write_csv(days, out):
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    for day in days:
+        intervals = " ".join(f"{start}-{end or ''}" for start, end in day["intervals"])
+        writer.writerow([day["date"].isoformat(), day["comment"] or "", intervals, day["total_minutes"]])
+
+
+def write_jsonl(days, out):
+    for day in days:
+        out.write(json.dumps(dict(day, date=day["date"].isoformat())) + "\n")
+
+
+def write_parquet(days, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("date", pa.date32()),
+        ("comment", pa.string()),
+        ("intervals", pa.list_(pa.list_(pa.string()))),
+        ("total_minutes", pa.int32()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for day in days:
+            batch.append(day)
+            if len(batch) == PARQUET_BATCH:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+
+def main(args):
+    output = args.output or "-"
+    fmt = args.format or SUFFIXES.get(Path(output).suffix.lower(), "csv")
+    if fmt == "parquet":
+        if output == "-":
+            error("Parquet is written to a file, give --output")
+            sys.exit(1)
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            error("Parquet export needs pyarrow (pip install pyarrow)")
+            sys.exit(1)
+
+    try:
+        first = parse_date(args.date_from) if args.date_from else date.min
+        last = parse_date(args.date_to) if args.date_to else date.max
+    except ValueError as e:
+        error(str(e))
+        sys.exit(1)
+
+    s = SheetReader(stream=True)
+    days = records(s, first, last)
+
+    if fmt == "parquet":
+        write_parquet(days, output)
+    elif output == "-":
+        (write_csv if fmt == "csv" else write_jsonl)(days, sys.stdout)
+    else:
+        with open(output, "w", newline="" if fmt == "csv" else None) as out:
+            (write_csv if fmt == "csv" else write_jsonl)(days, out)
+
+    # Keep stdout clean when the data goes there
+    pending = len(journal.pending())
+    message = f"{pending} journal entries are not synced yet and not in the export, run clock sync" if pending else None
+    if output == "-":
+        if message:
+            print(message, file=sys.stderr)
+    else:
+        if message:
+            error(message)
+        success(f"Exported to {output}")
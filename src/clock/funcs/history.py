@@ -0,0 +1,38 @@
+"""
+Totals and issues over any range of dates, across the yearly files
+"""
+from datetime import date, timedelta
+
+from ..utils import history
+from ..utils.checker import GAP
+from ..utils.diagnostics import Diagnostics
+from ..utils.print import error, info
+from ..utils.time import format_timedelta, parse_date
+
+
+def main(args):
+    try:
+        first = parse_date(args.date_from) if args.date_from else date(date.today().year, 1, 1)
+        last = parse_date(args.date_to) if args.date_to else date.today()
+    except ValueError as e:
+        error(str(e))
+        return
+
+    conn = history.connect()
+    try:
+        read = history.ingest(conn)
+        for path in read:
+            info(f"Updated history from {path.name}")
+
+        if args.gaps or args.issues:
+            diagnostics = Diagnostics()
+            for day, pair, kind in history.issues(conn, first, last, None if args.issues else [GAP]):
+                diagnostics.add(day, None, pair, kind)
+            diagnostics.render()
+            return
+
+        seconds, days = history.totals(conn, first, last)
+        info(f"{first.strftime('%d/%m/%Y')} - {last.strftime('%d/%m/%Y')}: "
+             f"{format_timedelta(timedelta(seconds=seconds))} worked over {days} days")
+    finally:
+        conn.close()
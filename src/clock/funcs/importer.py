@@ -0,0 +1,69 @@
+"""
+Import clock in/out times from badge-reader CSV exports, ICS calendars or logs
+
+The source is streamed through utils/events.py, then all days are written
+with a single save.
+"""
+import sys
+from pathlib import Path
+
+from ..utils import events
+from ..utils.print import error, info, success, warn
+from ..utils.sheet import Sheet
+from .setrow import write_times
+
+SUFFIXES = {".csv": "csv", ".ics": "ics", ".ical": "ics"}
+
+
+def main(args):
+    fmt = args.format or SUFFIXES.get(Path(args.source).suffix.lower(), "log")
+    if args.source == "-" and not args.format:
+        error("Give --format when reading from stdin")
+        sys.exit(1)
+
+    with Sheet.editing() as s:
+        problems = []
+        try:
+            f = sys.stdin if args.source == "-" else open(args.source, newline="" if fmt == "csv" else None, encoding="utf-8-sig")
+        except OSError as e:
+            error(f"Cannot read {args.source}: {e.strerror}")
+            sys.exit(1)
+        with f:
+            days = events.read(f, fmt, lambda day: bool(s.index.lookup(day)), problems)
+
+        for problem in problems:
+            error(problem)
+        if problems and not args.ignore_errors:
+            error("Nothing imported, fix the source or use --ignore-errors")
+            sys.exit(1)
+        if days.skipped_days:
+            warn(f"{len(days.skipped_days)} days are not in this year's sheet and were skipped")
+
+        written = kept = 0
+        for day in sorted(days.days):
+            row = s.index.lookup(day)
+            before = s.get_work_hours(row).format()
+            # Cells that do not read as times are still somebody's entry
+            occupied = any(s.value(row, work_cols[key]) not in (None, "") for work_cols in s.WORK_COLUMNS for key in ("start", "end"))
+            if occupied and not args.overwrite:
+                kept += 1
+                continue
+
+            intervals, dropped = events.cap(days.days[day], len(s.WORK_COLUMNS))
+            for start, end in dropped:
+                warn(f"{day.strftime('%d/%m/%Y')}: more than {len(s.WORK_COLUMNS)} periods, {start:%H:%M}-{end:%H:%M} was not imported")
+
+            write_times(s, row, [t for interval in intervals for t in interval])
+            after = s.get_work_hours(row).format()
+            if before != after:
+                written += 1
+                print(f"{day.strftime('%d/%m/%Y')}  {before}  ->  {after}")
+
+        if kept:
+            info(f"{kept} days already had times and were left alone, use --overwrite to replace them")
+        if args.dry_run:
+            info(f"Dry run: {days.intervals} periods over {len(days.days)} days read, nothing saved")
+            return
+        if written:
+            s.save()
+        success(f"Imported {written} days")
@@ -1,13 +1,51 @@
 """
-Print a row
+Print a row, or a range of days as one table
 """
 from datetime import date, timedelta
 
-from ..utils.sheet import Sheet
+from ..utils import journal
+from ..utils.print import error
+from ..utils.sheet import Sheet, SheetReader
+from ..utils.time import parse_date
+
+
+def resolve_range(args, date_target: date):
+    """Return (first, last) of the requested range, None for a single day"""
+    if args.week:
+        first = date_target - timedelta(days=date_target.weekday())
+        return first, first + timedelta(days=6)
+    if args.month:
+        first = date_target.replace(day=1)
+        last = (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+        return first, last
+    if args.date_from or args.date_to:
+        first = parse_date(args.date_from) if args.date_from else date(date_target.year, 1, 1)
+        last = parse_date(args.date_to) if args.date_to else date.today()
+        return first, last
+    return None
 
 
 def main(args):
-    s = Sheet()
     date_target = date.today() + timedelta(days=args.day)
+    if (args.week or args.month) and (args.date_from or args.date_to):
+        error("Use either --week/--month or --from/--to")
+        return
+    try:
+        period = resolve_range(args, date_target)
+    except ValueError as e:
+        error(str(e))
+        return
+
+    # Show the journal entries not synced yet on top of the file, without saving them
+    records = journal.pending()
+    s = Sheet() if records else SheetReader()
+    journal.replay(s, records)
+
+    if period:
+        s.print_range(*period)
+        return
+
     row = s.date_to_row(date_target)
+    if not row:
+        return 1
     s.print_row(row)
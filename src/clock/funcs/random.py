@@ -1,48 +1,62 @@
 """
 Generate random clock in and outs because why not
-"""
 
+All the empty working days of the range are drawn at once and saved together.
+"""
+import random
 from datetime import date, time
 
-from rich.console import Console
-from rich.live import Live
-
-from ..utils.print import success
-from ..utils.random import generate_day_times
+from ..utils.print import error, success
+from ..utils.random import generate_times
 from ..utils.sheet import Sheet
-from ..utils.time import is_holiday, is_weekend
+from ..utils.time import is_holiday, is_weekend, parse_date
 
-console = Console()
 
 def main(args):
-    s = Sheet()
-    today = date.today()
-    today_row = s.date_to_row(today)
-
-    with Live(console=console, refresh_per_second=4) as live:
-        for row in range(s.DATE_ROW_FIRST, today_row + 1):
-            date_target = s.sheet.cell(row=row, column=s.DATE_COLUMN).value
-            live.update(f"[green]Generating[/green] {date_target.strftime('%d/%m/%Y')} | Row: {row}")
-
-            total_time, work_hours = s.get_work_hours(row, verbose=True)
-            comment = s.sheet.cell(row=row, column=s.COMMENT_COLUMN).value
-            if not work_hours:
-                if (not is_holiday(comment) and not is_weekend(date_target)):   
-                    arrival, lunch_start, lunch_end, leave = generate_day_times(
-                        mean_arrival=time(args.h0, args.m0),
-                        sigma_arrival=args.s0,
-                        lunch_start=time(12, 30),
-                        lunch_mean_duration=30,
-                        lunch_sigma=args.sl,
-                        mean_leave=time(args.h1, args.m1),
-                        sigma_leave=args.s1
-                    )
-
-                    s.sheet.cell(row=row, column=s.WORK_COLUMNS[0]["start"]).value = arrival
-                    s.sheet.cell(row=row, column=s.WORK_COLUMNS[0]["end"]).value = lunch_start
-                    s.sheet.cell(row=row, column=s.WORK_COLUMNS[1]["start"]).value = lunch_end
-                    s.sheet.cell(row=row, column=s.WORK_COLUMNS[1]["end"]).value = leave
-                    
-    s.save()
-
-    success("Generated random times")
\ No newline at end of file
+    try:
+        first = parse_date(args.date_from) if args.date_from else None
+        last = parse_date(args.date_to) if args.date_to else date.today()
+    except ValueError as e:
+        error(str(e))
+        return
+
+    with Sheet.editing() as s:
+        first_row = s.date_to_row(first) if first else s.DATE_ROW_FIRST
+        last_row = s.date_to_row(last)
+        if not first_row or not last_row:
+            return
+
+        # Only days with nothing at all in them, partial days are left for you to fix
+        rows = []
+        for row, record in enumerate(s.records(first_row, last_row), start=first_row):
+            if record is None:
+                continue
+            if is_holiday(record.comment) or is_weekend(record.date):
+                continue
+            # Any filled cell either counts or is a problem
+            if record or record.problems:
+                continue
+            rows.append(row)
+
+        days = generate_times(
+            len(rows),
+            rng=random.Random(args.seed),
+            mean_arrival=time(args.h0, args.m0),
+            sigma_arrival=args.s0,
+            lunch_start=time(12, 30),
+            lunch_mean_duration=30,
+            lunch_sigma=args.sl,
+            mean_leave=time(args.h1, args.m1),
+            sigma_leave=args.s1,
+        )
+
+        for row, (arrival, lunch_start, lunch_end, leave) in zip(rows, days):
+            s.set_value(row, s.WORK_COLUMNS[0]["start"], arrival)
+            s.set_value(row, s.WORK_COLUMNS[0]["end"], lunch_start)
+            s.set_value(row, s.WORK_COLUMNS[1]["start"], lunch_end)
+            s.set_value(row, s.WORK_COLUMNS[1]["end"], leave)
+
+        if rows:
+            s.save()
+
+        success(f"Generated random times for {len(rows)} days")
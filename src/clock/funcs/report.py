@@ -0,0 +1,69 @@
+"""
+Worked hours per day, week or month and the balance against a daily target
+"""
+from datetime import date, timedelta
+
+from tabulate import tabulate
+
+from ..utils import config, journal
+from ..utils.print import error, info
+from ..utils.sheet import Sheet, SheetReader
+from ..utils.time import format_signed_timedelta, format_timedelta, parse_date
+from ..utils.totals import Totals
+
+PERIODS = {
+    "day": lambda d: (d, d.strftime("%a %d/%m/%Y")),
+    "week": lambda d: (d.isocalendar()[:2], f"Week {d.isocalendar()[1]} ({(d - timedelta(days=d.weekday())).strftime('%d/%m')})"),
+    "month": lambda d: ((d.year, d.month), d.strftime("%B %Y")),
+}
+
+
+def parse_target(text: str) -> timedelta:
+    hours, _, minutes = str(text).partition(":")
+    try:
+        return timedelta(hours=int(hours), minutes=int(minutes or 0))
+    except ValueError:
+        raise ValueError(f"Invalid target '{text}', use HH:MM")
+
+
+def main(args):
+    try:
+        first = parse_date(args.date_from) if args.date_from else date(date.today().year, 1, 1)
+        last = parse_date(args.date_to) if args.date_to else date.today()
+        target = parse_target(args.target or config.get("daily_target", "07:48"))
+    except ValueError as e:
+        error(str(e))
+        return
+
+    # Count the journal entries not synced yet, without saving them
+    records = journal.pending()
+    s = Sheet() if records else SheetReader()
+    journal.replay(s, records)
+
+    rows = s.index.rows_between(first, last)
+    if not rows:
+        error(f"No dates between {first} and {last} in the sheet")
+        return
+    totals = Totals.load(s)
+
+    # Consecutive rows of the same day/week/month
+    groups = []
+    for row in rows:
+        key, label = PERIODS[args.by](s.value(row, s.DATE_COLUMN).date())
+        if groups and groups[-1][0] == key:
+            groups[-1][3] = row
+        else:
+            groups.append([key, label, row, row])
+
+    table = []
+    balance = timedelta(0)
+    for _, label, first_row, last_row in groups:
+        worked_minutes, workdays = totals.between(first_row, last_row)
+        worked = timedelta(minutes=worked_minutes)
+        diff = worked - target * workdays
+        balance += diff
+        table.append([label, format_timedelta(worked), format_timedelta(target * workdays), format_signed_timedelta(diff), format_signed_timedelta(balance)])
+
+    print(tabulate(table, headers=["Period", "Worked", "Target", "Difference", "Balance"], tablefmt="grid"))
+    info(f"Balance from {first.strftime('%d/%m/%Y')} to {last.strftime('%d/%m/%Y')}: {format_signed_timedelta(balance)} "
+         f"(target {format_timedelta(target)} per working day)")
@@ -0,0 +1,156 @@
+"""
+Serve the other subcommands from memory
+
+Keeps the sheet and its index resident and runs the commands received over
+a unix socket, so that e.g. `clock in` neither loads nor saves the workbook.
+Edits are written to the file once nothing changed for --flush-delay seconds,
+and when the daemon stops (Ctrl+C, SIGTERM or `clock serve --stop`).
+"""
+import contextlib
+import json
+import os
+import signal
+import socket
+import threading
+
+from ..utils import daemon
+from ..utils.file import EXCEL_FILE, fingerprint
+from ..utils.print import error, info, success
+from ..utils.sheet import Sheet, SheetReader
+
+
+class ResidentSheet(Sheet):
+    """Sheet shared by every command the daemon runs, edits stay pending until flushed"""
+    def merge(self, edits, number_formats):
+        self.edits.update(edits)
+        self.number_formats.update(number_formats)
+        self.fold_edits()
+        self.server.schedule_flush()
+
+
+class Server:
+    def __init__(self, run, flush_delay: float):
+        """
+        Parameters:
+        run - function running a command from its argv, returns the exit code
+        flush_delay - seconds without edits before they are written to the file
+        """
+        self.run = run
+        self.flush_delay = flush_delay
+        self.lock = threading.RLock()
+        self.timer = None
+        self.running = True
+        self.reload()
+
+    def reload(self):
+        SheetReader.resident = None
+        resident = ResidentSheet()
+        resident.rows = list(resident.rows)
+        resident.server = self
+        SheetReader.resident = resident
+
+    def refresh(self):
+        """Reload the sheet if the file was changed by someone else (e.g. opened in Excel)"""
+        resident = SheetReader.resident
+        if not resident.edits and fingerprint(EXCEL_FILE) != resident.fingerprint:
+            self.reload()
+
+    def schedule_flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.flush_delay, self.flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        with self.lock:
+            resident = SheetReader.resident
+            if resident.edits:
+                resident.save()
+
+    def handle(self, connection):
+        with connection:
+            data = b"".join(iter(lambda: connection.recv(65536), b""))
+            # daemon.is_running connects and hangs up without a word
+            if not data.strip():
+                return
+            try:
+                message = json.loads(data)
+                argv = None if message.get("stop") else list(message["argv"])
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                connection.sendall(json.dumps({"output": f"Bad request: {e}\n", "code": 2}).encode())
+                return
+
+            if argv is None:
+                self.running = False
+                connection.sendall(json.dumps({"output": "", "code": 0}).encode())
+                return
+
+            stdout = daemon.ClientStdout(message.get("isatty", False))
+            with self.lock:
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stdout):
+                    try:
+                        self.refresh()
+                        code = self.run(argv) or 0
+                    except SystemExit as e:
+                        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    except Exception as e:
+                        error(str(e))
+                        code = 1
+            connection.sendall(json.dumps({"output": stdout.getvalue(), "code": code}).encode())
+
+    def serve(self):
+        daemon.SOCKET.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            daemon.SOCKET.unlink()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(daemon.SOCKET))
+        os.chmod(daemon.SOCKET, 0o600)
+        server.listen()
+        server.settimeout(0.5)
+
+        def shutdown(signum, frame):
+            self.running = False
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        try:
+            while self.running:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                try:
+                    self.handle(connection)
+                except Exception as e:
+                    # A client that went away or sent garbage must not take the daemon down
+                    error(f"Dropped a connection: {type(e).__name__}: {e}")
+        finally:
+            server.close()
+            with contextlib.suppress(FileNotFoundError):
+                daemon.SOCKET.unlink()
+            if self.timer is not None:
+                self.timer.cancel()
+            self.flush()
+
+
+def main(args):
+    if args.stop:
+        if daemon.stop():
+            success("Daemon stopped")
+        else:
+            error("No daemon running")
+        return
+
+    if daemon.is_running():
+        error(f"A daemon is already listening on {daemon.SOCKET}")
+        return
+
+    from ..main import run
+
+    server = Server(run, args.flush_delay)
+    info(f"Serving on {daemon.SOCKET}, edits are saved after {args.flush_delay}s without changes")
+    server.serve()
+    success("Daemon stopped, all edits saved")
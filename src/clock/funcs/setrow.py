@@ -1,11 +1,121 @@
 import sys
 from datetime import date, datetime
 
-from ..utils.print import success
+from ..utils.print import error, info, success
 from ..utils.sheet import Sheet
+from ..utils.time import parse_date
+
+
+def parse_times(times: list) -> list:
+    """Parse and validate HH:MM strings given as start/end pairs, raise ValueError if they are not valid"""
+    if len(times) % 2 != 0:
+        raise ValueError("Times must be provided in start/end pairs")
+
+    # Parse and validate all time strings
+    parsed_times = []
+    for t_str in times:
+        try:
+            parsed_times.append(datetime.strptime(t_str, "%H:%M").time())
+        except ValueError:
+            raise ValueError(f"Time '{t_str}' is not a valid HH:MM format.")
+
+    # Validate times ordering
+    for i in range(0, len(parsed_times), 2):
+        start = parsed_times[i]
+        end = parsed_times[i + 1]
+        if start >= end:
+            raise ValueError(f"Start time {start.strftime('%H:%M')} is not before end time {end.strftime('%H:%M')} in pair {i//2 + 1}.")
+
+        # If there is a next pair, ensure no overlap (end <= next start)
+        if i + 2 < len(parsed_times):
+            next_start = parsed_times[i + 2]
+            if end > next_start:
+                raise ValueError(f"End time {end.strftime('%H:%M')} of pair {i//2 + 1} is after start time {next_start.strftime('%H:%M')} of next pair.")
+
+    return parsed_times
+
+
+def write_times(s, row: int, parsed_times: list):
+    # Clear existing work time cells for this row
+    for work_column in s.WORK_COLUMNS:
+        s.set_value(row, work_column["start"], None)
+        s.set_value(row, work_column["end"], None)
+
+    # Write the validated times to the sheet
+    for i in range(0, len(parsed_times), 2):
+        s.set_value(row, s.WORK_COLUMNS[i // 2]["start"], parsed_times[i], number_format="HH:mm")
+        s.set_value(row, s.WORK_COLUMNS[i // 2]["end"], parsed_times[i + 1], number_format="HH:mm")
+
+
+def batch(args):
+    """
+    Set many days at once from lines like `DD/MM 9:30 13:30 14:30 18:30`.
+    Everything is validated first, then written with a single save.
+    """
+    year = date.today().year
+    try:
+        f = sys.stdin if args.file == "-" else open(args.file)
+        with f:
+            lines = list(f)
+    except OSError as e:
+        error(f"Cannot read {args.file}: {e.strerror}")
+        sys.exit(1)
+
+    days = {}
+    errors = []
+    for n, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        date_str, *times = line.split()
+        try:
+            date_target = parse_date(date_str, year)
+            if date_target in days:
+                raise ValueError(f"{date_target.strftime('%d/%m/%Y')} is given more than once")
+            if not times:
+                raise ValueError("No times given")
+            days[date_target] = parse_times(times)
+        except ValueError as e:
+            errors.append(f"line {n}: {e}")
+
+    with Sheet.editing() as s:
+        rows = {}
+        for date_target, parsed_times in days.items():
+            row = s.index.lookup(date_target)
+            if not row:
+                errors.append(f"{date_target.strftime('%d/%m/%Y')} is not in the sheet")
+            elif len(parsed_times) // 2 > len(s.WORK_COLUMNS):
+                errors.append(f"{date_target.strftime('%d/%m/%Y')}: at most {len(s.WORK_COLUMNS)} start/end pairs per day")
+            rows[date_target] = row
+
+        if errors:
+            for e in errors:
+                print(f"Error: {e}")
+            sys.exit(1)
+
+        for date_target in sorted(days):
+            row = rows[date_target]
+            before = s.get_work_hours(row).format()
+            write_times(s, row, days[date_target])
+            after = s.get_work_hours(row).format()
+            if args.dry_run or before != after:
+                print(f"{date_target.strftime('%d/%m/%Y')}  {before}  ->  {after}")
+
+        if args.dry_run:
+            info(f"Dry run: {len(days)} days checked, nothing saved")
+            return
+
+        s.save()
+        success(f"Set work times for {len(days)} days")
 
 
 def main(args):
+    if args.file:
+        return batch(args)
+    if args.dry_run:
+        error("--dry-run only works with --file")
+        sys.exit(1)
+
     # Use current year
     year = date.today().year
 
@@ -29,58 +139,20 @@ def main(args):
         print("Error: --times argument is required")
         sys.exit(1)
 
-    times = args.times
-    if len(times) % 2 != 0:
-        print("Error: Times must be provided in start/end pairs")
+    try:
+        parsed_times = parse_times(args.times)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-    # Parse and validate all time strings
-    parsed_times = []
-    for t_str in times:
-        try:
-            t = datetime.strptime(t_str, "%H:%M").time()
-            parsed_times.append(t)
-        except ValueError:
-            print(f"Error: Time '{t_str}' is not a valid HH:MM format.")
-            sys.exit(1)
-
-    # Validate times ordering
-    for i in range(0, len(parsed_times), 2):
-        start = parsed_times[i]
-        end = parsed_times[i + 1]
-        if start >= end:
-            print(f"Error: Start time {start.strftime('%H:%M')} is not before end time {end.strftime('%H:%M')} in pair {i//2 + 1}.")
-            sys.exit(1)
-
-        # If there is a next pair, ensure no overlap (end <= next start)
-        if i + 2 < len(parsed_times):
-            next_start = parsed_times[i + 2]
-            if end > next_start:
-                print(f"Error: End time {end.strftime('%H:%M')} of pair {i//2 + 1} is after start time {next_start.strftime('%H:%M')} of next pair.")
-                sys.exit(1)
-
     # Now proceed to write to sheet
-    s = Sheet()
-    date_target = date(year, month, day)
-    row = s.date_to_row(date_target)
-
-    # Clear existing work time cells for this row
-    for work_column in s.WORK_COLUMNS:
-        s.sheet.cell(row=row, column=work_column["start"]).value = None
-        s.sheet.cell(row=row, column=work_column["end"]).value = None
-
-    # Write the validated times to the sheet
-    for i in range(0, len(parsed_times), 2):
-        start_time = parsed_times[i]
-        end_time = parsed_times[i + 1]
-        start_cell = s.sheet.cell(row=row, column=s.WORK_COLUMNS[i // 2]["start"])
-        end_cell = s.sheet.cell(row=row, column=s.WORK_COLUMNS[i // 2]["end"])
-
-        start_cell.value = start_time
-        start_cell.number_format = "HH:mm"
-        end_cell.value = end_time
-        end_cell.number_format = "HH:mm"
-
-    s.save()
-    success(f"Set work times for {date_target.strftime('%d/%m/%Y')}")
-    s.print_row(row)
\ No newline at end of file
+    with Sheet.editing() as s:
+        date_target = date(year, month, day)
+        row = s.date_to_row(date_target)
+        if not row:
+            return 1
+
+        write_times(s, row, parsed_times)
+        s.save()
+        success(f"Set work times for {date_target.strftime('%d/%m/%Y')}")
+        s.print_row(row)
@@ -0,0 +1,25 @@
+"""
+Print how long you have been working today, fast enough for a shell prompt
+
+Only reads the status file written by the commands (utils/status.py); the
+workbook is read when that file is stale.
+"""
+from ..utils import status
+
+
+def main(args):
+    data = status.read()
+    if data is None:
+        data = status.refresh()
+        if data is None:
+            from ..utils.print import error
+
+            error("Today is not in the sheet")
+            return 1
+
+    if args.json:
+        import json
+
+        print(json.dumps(data))
+    else:
+        print(status.describe(data))
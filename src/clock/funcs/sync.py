@@ -0,0 +1,25 @@
+"""
+Replay the journal into the time sheet
+"""
+from ..utils import journal
+from ..utils.print import error, info, success
+
+
+def sync_and_report():
+    replayed, rejected = journal.sync()
+    for record, reason in rejected:
+        error(f"Skipped '{record['op']}' of {record['date']} {record.get('time', '')[:5]}: {reason}")
+    if replayed:
+        success(f"Synced {replayed - len(rejected)} of {replayed} journal entries")
+    else:
+        info("Nothing to sync")
+
+
+def sync_if_due():
+    """Sync once the journal holds "journal_threshold" records"""
+    if journal.threshold_reached():
+        sync_and_report()
+
+
+def main(args):
+    sync_and_report()
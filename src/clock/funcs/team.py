@@ -0,0 +1,57 @@
+"""
+Check and total the time sheets of a whole group in one report
+"""
+import json
+from datetime import date, timedelta
+
+from tabulate import tabulate
+
+from ..utils import config
+from ..utils.print import error, info
+from ..utils.team import summarize_all, workbooks
+from ..utils.time import format_signed_timedelta, format_timedelta, parse_date
+from .report import parse_target
+
+
+def main(args):
+    try:
+        first = parse_date(args.date_from) if args.date_from else date(date.today().year, 1, 1)
+        last = parse_date(args.date_to) if args.date_to else date.today()
+        target = parse_target(args.target or config.get("daily_target", "07:48"))
+    except ValueError as e:
+        error(str(e))
+        return 1
+
+    paths = workbooks(args.sources)
+    if not paths:
+        error("No xlsx files found in " + ", ".join(args.sources))
+        return 1
+
+    summaries = sorted(summarize_all(paths, first, last, args.workers), key=lambda summary: summary["person"].lower())
+    failed = [summary for summary in summaries if "error" in summary]
+    done = [summary for summary in summaries if "error" not in summary]
+    for summary in done:
+        summary["balance"] = summary["worked"] - int(target.total_seconds()) // 60 * summary["workdays"]
+
+    if args.format == "json":
+        print(json.dumps({"from": first.isoformat(), "to": last.isoformat(), "target": format_timedelta(target), "people": summaries}, indent=2))
+        return 1 if failed else 0
+
+    table = [
+        [summary["person"], summary["days"], format_timedelta(timedelta(minutes=summary["worked"])),
+         format_signed_timedelta(timedelta(minutes=summary["balance"])), summary["errors"], summary["warnings"]]
+        for summary in done
+    ]
+    table.append([
+        f"Total ({len(done)})",
+        sum(summary["days"] for summary in done),
+        format_timedelta(timedelta(minutes=sum(summary["worked"] for summary in done))),
+        format_signed_timedelta(timedelta(minutes=sum(summary["balance"] for summary in done))),
+        sum(summary["errors"] for summary in done),
+        sum(summary["warnings"] for summary in done),
+    ])
+    print(tabulate(table, headers=["Person", "Days", "Worked", "Balance", "Errors", "Warnings"], tablefmt="grid"))
+    for summary in failed:
+        error(f"{summary['person']} ({summary['path']}): {summary['error']}")
+    info(f"{first.strftime('%d/%m/%Y')} - {last.strftime('%d/%m/%Y')}, target {format_timedelta(target)} per working day")
+    return 1 if failed else 0
@@ -1,15 +1,37 @@
-import argparse
+import sys
 
 from . import funcs
 
+# Subcommands a running `clock serve` can answer from memory
+DAEMON_COMMANDS = {"in", "out", "print", "check", "clear", "set", "random", "sync", "report"}
+
+
+def get_parser():
+    # Not needed by the fast path of `clock status`
+    import argparse
 
-def main():
     parser = argparse.ArgumentParser(prog="clock")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=None,
+        help="Print the time and peak memory of each phase of the command (or CLOCK_PROFILE=1)"
+    )
+    parser.add_argument(
+        "--profile-json",
+        metavar="FILE",
+        help="Append the phase timings to FILE as a json line (or CLOCK_PROFILE_JSON=FILE)"
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="Dump cProfile stats of the command to FILE (or CLOCK_CPROFILE=FILE)"
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # helloworld command
     hw_parser = subparsers.add_parser("helloworld", help="Print hello world")
-    hw_parser.set_defaults(func=funcs.helloworld.main)
+    hw_parser.set_defaults(func=funcs.handler("helloworld"))
 
     # clock-in command
     clockin_parser = subparsers.add_parser("in", help="Clock in")
@@ -31,7 +53,7 @@ def main():
         default=0,
         help="Number of days to clock in (default: 0)"
     )
-    clockin_parser.set_defaults(func=funcs.clockin.main)
+    clockin_parser.set_defaults(func=funcs.handler("clockin"))
 
     # clock-out command
     clockout_parser = subparsers.add_parser("out", help="Clock out")
@@ -53,7 +75,7 @@ def main():
         default=0,
         help="Number of days to clock out (default: 0)"
     )
-    clockout_parser.set_defaults(func=funcs.clockout.main)
+    clockout_parser.set_defaults(func=funcs.handler("clockout"))
 
     # print row command
     print_parser = subparsers.add_parser("print", help="Print")
@@ -63,11 +85,54 @@ def main():
         default=0,
         help="Number of days to print (default: 0)"
     )
-    print_parser.set_defaults(func=funcs.printrow.main)
+    print_period = print_parser.add_mutually_exclusive_group()
+    print_period.add_argument(
+        "-w", "--week",
+        action="store_true",
+        help="Print the whole week (Monday to Sunday) of the day"
+    )
+    print_period.add_argument(
+        "--month",
+        action="store_true",
+        help="Print the whole month of the day"
+    )
+    print_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="Print from this day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: 1st of January)"
+    )
+    print_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Print until this day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: today)"
+    )
+    print_parser.set_defaults(func=funcs.handler("printrow"))
 
     # check rows command
     check_parser = subparsers.add_parser("check", help="Check sanity of rows")
-    check_parser.set_defaults(func=funcs.check.main)
+    check_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Check every row again instead of only the ones changed since the last check"
+    )
+    check_parser.add_argument(
+        "--format",
+        choices=["text", "table", "json", "summary"],
+        default="text",
+        help="How to show the findings (default: text)"
+    )
+    check_parser.add_argument(
+        "--fail-on",
+        choices=["error", "warning", "never"],
+        default="never",
+        help="Exit with 1 if there is a finding this bad or worse (default: never)"
+    )
+    check_parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="Plain output without colors or spinner, for scripts and slow terminals"
+    )
+    check_parser.set_defaults(func=funcs.handler("check"))
 
     # clear row command
     clear_parser = subparsers.add_parser("clear", help="Clear row work hours")
@@ -77,7 +142,7 @@ def main():
         default=0,
         help="Shift in number of days (default: 0)"
     )
-    clear_parser.set_defaults(func=funcs.clear.main)
+    clear_parser.set_defaults(func=funcs.handler("clear"))
 
     # set row command
     setrow_parser = subparsers.add_parser("set", help="Set row work hours")
@@ -94,7 +159,16 @@ def main():
     nargs="+",
     help="List of time arguments: TIME1_START TIME1_END TIME2_START TIME2_END ..."
     )
-    setrow_parser.set_defaults(func=funcs.setrow.main)
+    setrow_parser.add_argument(
+        "-f", "--file",
+        help="Set many days at once from a file ('-' for stdin), one 'DD/MM TIME1_START TIME1_END ...' per line"
+    )
+    setrow_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With --file, show what would change without saving"
+    )
+    setrow_parser.set_defaults(func=funcs.handler("setrow"))
 
     # set row command
     random_parser = subparsers.add_parser("random", help="Fill work hours")
@@ -140,9 +214,245 @@ def main():
         default=20,
         help="leave sigma"
     )
-    random_parser.set_defaults(func=funcs.random.main)
+    random_parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed of the generator, the same seed gives the same times"
+    )
+    random_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="First day to fill, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: 1st of January)"
+    )
+    random_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Last day to fill, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: today)"
+    )
+    random_parser.set_defaults(func=funcs.handler("random"))
+
+    # import command
+    import_parser = subparsers.add_parser("import", help="Import clock in/out times from a CSV, ICS or log file")
+    import_parser.add_argument(
+        "source",
+        help="File to import ('-' for stdin)"
+    )
+    import_parser.add_argument(
+        "--format",
+        choices=["csv", "ics", "log"],
+        help="Format of the source (default: from the file extension, else log)"
+    )
+    import_parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace the times of days that already have some"
+    )
+    import_parser.add_argument(
+        "--ignore-errors",
+        action="store_true",
+        help="Import what could be read even if some lines could not"
+    )
+    import_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show what would change without saving"
+    )
+    import_parser.set_defaults(func=funcs.handler("importer"))
+
+    # export command
+    export_parser = subparsers.add_parser("export", help="Export the days as CSV, JSON Lines or Parquet")
+    export_parser.add_argument(
+        "-o", "--output",
+        help="File to write (default: stdout)"
+    )
+    export_parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl", "parquet"],
+        help="Output format (default: from the file extension, else csv). Parquet needs pyarrow"
+    )
+    export_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="First day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: the first in the sheet)"
+    )
+    export_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Last day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: the last in the sheet)"
+    )
+    export_parser.set_defaults(func=funcs.handler("export"))
+
+    # report command
+    report_parser = subparsers.add_parser("report", help="Worked hours and balance against the daily target")
+    report_parser.add_argument(
+        "--by",
+        choices=["day", "week", "month"],
+        default="week",
+        help="Group the days by day, week or month (default: week)"
+    )
+    report_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="First day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: 1st of January)"
+    )
+    report_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Last day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: today)"
+    )
+    report_parser.add_argument(
+        "-t", "--target",
+        help="Hours to work per working day as HH:MM (default: daily_target setting, else 07:48)"
+    )
+    report_parser.set_defaults(func=funcs.handler("report"))
+
+    # status command
+    status_parser = subparsers.add_parser("status", help="How long you have been working today, e.g. for your shell prompt")
+    status_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print today's intervals (minutes since midnight, -1 while clocked in) as json"
+    )
+    status_parser.set_defaults(func=funcs.handler("status"))
+
+    # team command
+    team_parser = subparsers.add_parser("team", help="Check and total the time sheets of a whole group")
+    team_parser.add_argument(
+        "sources",
+        nargs="+",
+        help="xlsx files, directories (searched recursively) or globs"
+    )
+    team_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="First day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: 1st of January)"
+    )
+    team_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Last day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: today)"
+    )
+    team_parser.add_argument(
+        "-t", "--target",
+        help="Hours to work per working day as HH:MM (default: daily_target setting, else 07:48)"
+    )
+    team_parser.add_argument(
+        "-j", "--workers",
+        type=int,
+        help="Workbooks read in parallel (default: one per core)"
+    )
+    team_parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="Output format (default: table)"
+    )
+    team_parser.set_defaults(func=funcs.handler("team"))
+
+    # sync command
+    sync_parser = subparsers.add_parser("sync", help="Write the journaled clock in/out/clear to the file")
+    sync_parser.set_defaults(func=funcs.handler("sync"))
+
+    # history command
+    history_parser = subparsers.add_parser("history", help="Totals and issues across the yearly files")
+    history_parser.add_argument(
+        "--from",
+        dest="date_from",
+        help="First day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: 1st of January)"
+    )
+    history_parser.add_argument(
+        "--to",
+        dest="date_to",
+        help="Last day, DD/MM, DD/MM/YYYY or YYYY-MM-DD (default: today)"
+    )
+    history_parser.add_argument(
+        "--gaps",
+        action="store_true",
+        help="List the days with gaps instead of the total"
+    )
+    history_parser.add_argument(
+        "--issues",
+        action="store_true",
+        help="List every issue found by check instead of the total"
+    )
+    history_parser.set_defaults(func=funcs.handler("history"))
+
+    # serve command
+    serve_parser = subparsers.add_parser("serve", help="Keep the sheet in memory and serve the other commands")
+    serve_parser.add_argument(
+        "--flush-delay",
+        type=float,
+        default=5,
+        help="Seconds without changes before edits are saved to the file (default: 5)"
+    )
+    serve_parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon, saving pending edits"
+    )
+    serve_parser.set_defaults(func=funcs.handler("serve"))
+
+    return parser
+
+
+def profile_settings(args=None) -> dict:
+    """Profiling options from the command line, else from the environment/config"""
+    from .utils import config
+
+    return {
+        key: getattr(args, key, None) or config.get(key)
+        for key in ("profile", "profile_json", "cprofile")
+    }
+
+
+def run(argv=None):
+    args = get_parser().parse_args(argv)
+    settings = profile_settings(args)
+    if not any(settings.values()):
+        return args.func(args)
+
+    import cProfile
+
+    from .utils import profiling
+
+    profiling.start()
+    profiler = cProfile.Profile() if settings["cprofile"] else None
+    try:
+        if profiler:
+            profiler.enable()
+        return args.func(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(settings["cprofile"])
+        data = profiling.results(sys.argv[1:] if argv is None else argv)
+        if settings["profile"]:
+            profiling.print_breakdown(data)
+        if settings["profile_json"]:
+            profiling.write_json_line(data, settings["profile_json"])
+
+
+def main():
+    argv = sys.argv[1:]
+
+    # Shell prompts run `clock status` all the time: no parser, no config, no daemon, just the status file.
+    # Profile it with `clock --profile status`.
+    if argv in (["status"], ["status", "--json"]):
+        from types import SimpleNamespace
+
+        from .funcs import status
+
+        sys.exit(status.main(SimpleNamespace(json="--json" in argv)) or 0)
+
+    # With a daemon running the command is answered from memory (it cannot read our files or stdin).
+    # Global options such as --profile come before the command, so those runs stay local.
+    reads_file = any(arg == "--file" or arg.startswith("--file=") or (arg.startswith("-f") and not arg.startswith("--")) for arg in argv)
+    if argv and argv[0] in DAEMON_COMMANDS and not reads_file and not any(profile_settings().values()):
+        from .utils import daemon
+
+        code = daemon.request(argv)
+        if code is not None:
+            sys.exit(code)
 
-    args = parser.parse_args()
-    args.func(args)
-    
-    
\ No newline at end of file
+    # Commands may return an exit code, e.g. check --fail-on
+    sys.exit(run(argv) or 0)
@@ -0,0 +1,208 @@
+"""
+Columnar validation of a range of rows
+
+Instead of going through get_work_hours row by row, the date, comment and
+work columns are loaded once (times as integer minutes since midnight, -1
+for an empty cell, see day.py) and every rule is evaluated column by column
+over the whole range. The findings are the same as the row by row check, in the same
+order: per row, the work pairs first and then the holiday/weekend warning.
+
+check_incremental keeps the findings of every checked row, keyed by the
+content of the row, in a sidecar cache: later runs only check the rows that
+changed and the ones never checked before, and replay the cached findings
+for the rest.
+"""
+import json
+import zlib
+from array import array
+from datetime import date
+
+from . import day
+from .file import cache_file
+from .time import is_holiday, is_weekend
+
+GAP = "gap"
+START_MISSING = "start_missing"
+END_MISSING = "end_missing"
+INVERTED = "inverted"
+HOLIDAY_WORK = "holiday_work"
+
+# DayRecord flag -> kind
+FLAG_KINDS = {day.GAP: GAP, day.START_MISSING: START_MISSING, day.END_MISSING: END_MISSING, day.INVERTED: INVERTED}
+
+# kind -> message, pair is the 1-based index of the work period
+MESSAGES = {
+    GAP: "Gap detected: work period {pair} has entries after empty pair",
+    START_MISSING: "Work start must be filled if work end is filled (pair {pair})",
+    END_MISSING: "Work end missing for work start (pair {pair})",
+    INVERTED: "Work end time is before start time (pair {pair})",
+    HOLIDAY_WORK: "You worked on a holiday or a weekend",
+}
+
+
+def _pick(s, values: tuple) -> list:
+    """Date, comment and work minutes of a row of Sheet.block"""
+    first = s.FIRST_COLUMN
+    picked = [values[s.DATE_COLUMN - first], values[s.COMMENT_COLUMN - first]]
+    picked += [day.to_minutes(values[work_cols[key] - first]) for work_cols in s.WORK_COLUMNS for key in ("start", "end")]
+    return picked
+
+
+def _block(s, rows) -> list:
+    """The Sheet.block rows of any sequence of rows, read in one pass from the first to the last"""
+    if not rows:
+        return []
+    first = min(rows)
+    block = s.block(first, max(rows))
+    return [block[row - first] for row in rows]
+
+
+def row_keys(s, rows) -> list:
+    """Hash of the cells each row is checked (and totalled) from"""
+    return [zlib.crc32(repr(_pick(s, values)).encode()) for values in _block(s, rows)]
+
+
+def load_columns(s, first_row: int, last_row: int):
+    """
+    Read the columns needed by check_columns for rows first_row..last_row of a SheetReader.
+
+    Returns:
+        dates, comments, starts, ends (starts and ends hold one array per work pair)
+    """
+    return load_rows(s, range(first_row, last_row + 1))
+
+
+def load_rows(s, rows):
+    """Same as load_columns for any sequence of rows"""
+    picked = [_pick(s, values) for values in _block(s, rows)]
+    dates = [values[0] for values in picked]
+    comments = [values[1] for values in picked]
+    starts = [array("q", (values[2 + 2 * i] for values in picked)) for i in range(len(s.WORK_COLUMNS))]
+    ends = [array("q", (values[3 + 2 * i] for values in picked)) for i in range(len(s.WORK_COLUMNS))]
+    return dates, comments, starts, ends
+
+
+def check_columns(dates, comments, starts, ends) -> list:
+    """
+    Returns:
+        list of (offset, pair, kind) sorted by row then pair, offset is relative
+        to the first loaded row, pair is None for findings about the whole day
+    """
+    n = len(dates)
+    empty_before = [False] * n
+    worked = [False] * n
+    per_pair = []
+
+    for pair, (start, end) in enumerate(zip(starts, ends), start=1):
+        found = []
+        empty = [a < 0 and b < 0 for a, b in zip(start, end)]
+
+        for i in range(n):
+            if empty[i]:
+                continue
+            flag = day.pair_flag(start[i], end[i], empty_before[i])
+            if flag:
+                found.append((i, pair, FLAG_KINDS[flag]))
+            if not flag or flag == day.END_MISSING:
+                worked[i] = True
+
+        empty_before = [a or b for a, b in zip(empty_before, empty)]
+        per_pair.append(found)
+
+    per_day = [
+        (i, None, HOLIDAY_WORK)
+        for i in range(n)
+        if worked[i] and (is_holiday(comments[i]) or (isinstance(dates[i], date) and is_weekend(dates[i])))
+    ]
+
+    findings = [f for found in per_pair for f in found] + per_day
+    findings.sort(key=_sort_key(len(starts)))
+    return findings
+
+
+def day_totals(starts, ends) -> list:
+    """
+    Worked minutes of each row, counted like get_work_hours: the pairs after
+    the first empty one, pairs without a start and inverted pairs do not count.
+    """
+    totals = [0] * (len(starts[0]) if starts else 0)
+    open_rows = [True] * len(totals)
+    for start, end in zip(starts, ends):
+        for i, (a, b) in enumerate(zip(start, end)):
+            if a < 0 and b < 0:
+                open_rows[i] = False
+            elif open_rows[i] and a >= 0 and b >= a:
+                totals[i] += b - a
+    return totals
+
+
+def _sort_key(n_pairs):
+    # Whole-day findings come after the pairs of the same row
+    return lambda f: (f[0], f[1] if f[1] is not None else n_pairs + 1)
+
+
+def check_incremental(s, first_row: int, last_row: int, full: bool = False) -> list:
+    """
+    Check rows first_row..last_row of a SheetReader, reusing the cached findings
+    of the rows that did not change. full checks every row again.
+
+    Returns:
+        list of (offset, pair, kind), like check_columns
+    """
+    rows = range(first_row, last_row + 1)
+    target = cache_file(s.path, "check.json")
+    cached = {}
+    if not full:
+        try:
+            with open(target) as f:
+                cached = json.load(f)
+            if cached.get("layout") != s.SNAPSHOT_COLUMNS:
+                cached = {}
+        except (OSError, ValueError):
+            cached = {}
+
+    # row -> [key, findings as [pair, kind]]
+    known = {int(row): entry for row, entry in cached.get("rows", {}).items()}
+    unsaved = s.unsaved_rows()
+    if cached.get("fingerprint") == s.fingerprint:
+        # Same file: only what is not saved yet can differ
+        stale = [row for row in rows if row not in known or row in unsaved]
+        keys = {row: known[row][0] for row in rows if row in known}
+    else:
+        keys = dict(zip(rows, row_keys(s, rows)))
+        stale = [row for row in rows if row not in known or known[row][0] != keys[row]]
+
+    findings = []
+    for row in rows:
+        if row in known and row not in stale:
+            findings += [(row - first_row, pair, kind) for pair, kind in known[row][1]]
+
+    if stale:
+        dates, comments, starts, ends = load_rows(s, stale)
+        for offset, pair, kind in check_columns(dates, comments, starts, ends):
+            findings.append((stale[offset] - first_row, pair, kind))
+        keys.update(zip(stale, row_keys(s, stale)))
+    findings.sort(key=_sort_key(len(s.WORK_COLUMNS)))
+
+    # Unsaved rows are checked but not remembered, the file does not have them
+    by_row = {row: [] for row in rows if row not in unsaved}
+    for offset, pair, kind in findings:
+        if first_row + offset in by_row:
+            by_row[first_row + offset].append([pair, kind])
+    data = {
+        "fingerprint": s.fingerprint,
+        "layout": s.SNAPSHOT_COLUMNS,
+        "rows": {row: [keys[row], entries] for row, entries in by_row.items()},
+    }
+    # Rows after last_row checked by an earlier run stay cached
+    for row, entry in known.items():
+        if row > last_row and row not in unsaved:
+            data["rows"].setdefault(row, entry)
+    if stale or data["fingerprint"] != cached.get("fingerprint") or full:
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "w") as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+    return findings
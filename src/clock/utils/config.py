@@ -0,0 +1,34 @@
+"""
+User configuration
+
+Settings are read from $HOME/.config/desyclock/config.json, e.g.
+    {"journal": true, "journal_threshold": 20}
+and can be overridden with environment variables named CLOCK_<KEY>, e.g.
+CLOCK_JOURNAL=1. Environment values are parsed as json when possible.
+"""
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+CONFIG_FILE = Path.home() / ".config" / "desyclock" / "config.json"
+
+
+@lru_cache(maxsize=None)
+def _load() -> dict:
+    try:
+        with open(CONFIG_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def get(key: str, default=None):
+    """Return the setting key, from the environment first, then the config file, else default"""
+    env = os.environ.get(f"CLOCK_{key.upper()}")
+    if env is not None:
+        try:
+            return json.loads(env)
+        except ValueError:
+            return env
+    return _load().get(key, default)
@@ -0,0 +1,69 @@
+"""
+Client side of the optional `clock serve` daemon (see funcs/serve.py)
+
+Kept free of heavy imports: it runs before anything else in `clock` and must
+fall back to direct file access quickly when no daemon is listening.
+"""
+import io
+import json
+import os
+import socket
+
+from .file import CACHE_DIR
+
+SOCKET = CACHE_DIR / "clock.sock"
+
+
+class ClientStdout(io.StringIO):
+    """Captured stdout pretending to be the client terminal, so that rich keeps its colors"""
+    def __init__(self, isatty):
+        super().__init__()
+        self._isatty = isatty
+
+    def isatty(self):
+        return self._isatty
+
+
+def _send(message: dict, timeout: float = None) -> dict:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(str(SOCKET))
+        client.sendall(json.dumps(message).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        data = b"".join(iter(lambda: client.recv(65536), b""))
+    return json.loads(data)
+
+
+def request(argv: list):
+    """
+    Run a command in the daemon.
+
+    Returns the exit code, or None if no daemon is running and the command
+    has to run locally.
+    """
+    if not SOCKET.exists():
+        return None
+    try:
+        reply = _send({"argv": argv, "isatty": os.isatty(1)})
+    except (OSError, ValueError):
+        return None
+    print(reply["output"], end="")
+    return reply["code"]
+
+
+def is_running() -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(SOCKET))
+        return True
+    except OSError:
+        return False
+
+
+def stop() -> bool:
+    """Ask a running daemon to flush and exit, return False if none is running"""
+    try:
+        _send({"stop": True}, timeout=30)
+        return True
+    except (OSError, ValueError):
+        return False
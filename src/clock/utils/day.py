@@ -0,0 +1,110 @@
+"""
+Work times of one day as integer minutes since midnight
+
+The cells of a row hold datetime.time values (or datetime, or nothing).
+They are turned into minutes once, with time.time_to_minutes, and every
+rule and total works on the integers from there; minutes_to_time goes back
+when a time has to be written or shown. -1 stands for an empty cell.
+
+The rules for the work pairs of a day live here, the row by row view
+(DayRecord, used by get_work_hours) and the columnar check (checker.py)
+both apply pair_flag.
+"""
+from datetime import datetime
+
+from .time import time_to_minutes
+
+EMPTY = -1
+
+# What is wrong with a work pair, or-ed together in DayRecord.flags
+GAP = 1            # filled after an empty pair, does not count
+START_MISSING = 2  # only the end is filled, does not count
+END_MISSING = 4    # clocked in, not out yet: kept as an open interval
+INVERTED = 8       # ends before it starts, does not count
+
+
+def to_minutes(value) -> int:
+    """Minutes since midnight of a cell value, EMPTY for None"""
+    if value is None:
+        return EMPTY
+    return time_to_minutes(value)
+
+
+def pair_flag(start: int, end: int, after_empty: bool) -> int:
+    """Flag of a work pair that is not empty (0 if it is fine), after_empty if an earlier pair of the day was empty"""
+    if after_empty:
+        return GAP
+    if start < 0:
+        return START_MISSING
+    if end < 0:
+        return END_MISSING
+    if end < start:
+        return INVERTED
+    return 0
+
+
+class DayRecord:
+    """
+    A day of the sheet with its comment and its work pairs after the rules:
+    intervals holds (start, end) in minutes of the pairs that count, end is
+    EMPTY for the open one.
+    problems lists (pair, flag) with pair 1-based, flags is all of them or-ed.
+    """
+    __slots__ = ("date", "comment", "intervals", "flags", "problems")
+
+    def __init__(self, date_target, intervals: list, flags: int = 0, problems: tuple = (), comment=None):
+        self.date = date_target
+        self.comment = comment
+        self.intervals = intervals
+        self.flags = flags
+        self.problems = problems
+
+    @classmethod
+    def from_values(cls, date_target, pairs, comment=None):
+        """From the (start, end) cell values of the work pairs"""
+        intervals = []
+        flags = 0
+        problems = ()
+        after_empty = False
+        for i, (start, end) in enumerate(pairs, start=1):
+            start, end = to_minutes(start), to_minutes(end)
+            if start < 0 and end < 0:
+                after_empty = True
+                continue
+            flag = pair_flag(start, end, after_empty)
+            if flag:
+                flags |= flag
+                problems += ((i, flag),)
+            if not flag or flag == END_MISSING:
+                intervals.append((start, end))
+        if isinstance(date_target, datetime):
+            date_target = date_target.date()
+        return cls(date_target, intervals, flags, problems, comment)
+
+    @property
+    def total(self) -> int:
+        """Worked minutes, the open interval does not count"""
+        return sum(end - start for start, end in self.intervals if end >= 0)
+
+    @property
+    def is_open(self) -> bool:
+        """Clocked in and not out yet"""
+        return bool(self.intervals) and self.intervals[-1][1] < 0
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def __bool__(self):
+        return bool(self.intervals)
+
+    def format(self) -> str:
+        """e.g. 09:00-12:30 13:00- (- without any interval)"""
+        return " ".join(f"{format_minutes(start)}-{format_minutes(end)}" for start, end in self.intervals) or "-"
+
+    def __repr__(self):
+        return f"DayRecord({self.date}, {self.format()}, flags={self.flags})"
+
+
+def format_minutes(m: int) -> str:
+    """HH:MM, empty for EMPTY"""
+    return "" if m < 0 else f"{m // 60:02d}:{m % 60:02d}"
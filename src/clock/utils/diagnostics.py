@@ -0,0 +1,119 @@
+"""
+Findings of a check, collected while scanning and rendered in one go
+
+The scan only records what it finds (date, row, work pair, kind, severity),
+nothing is printed until render is called, so the output is written in a
+single batch and can be text for people (through rich, or plain), a table,
+json for scripts or just the counts.
+"""
+import json
+import sys
+from typing import NamedTuple
+
+from .checker import END_MISSING, GAP, HOLIDAY_WORK, INVERTED, MESSAGES, START_MISSING
+
+ERROR = "error"
+WARNING = "warning"
+SEVERITY = {
+    GAP: ERROR,
+    START_MISSING: ERROR,
+    INVERTED: ERROR,
+    END_MISSING: WARNING,
+    HOLIDAY_WORK: WARNING,
+}
+
+# --fail-on: the lowest severity that makes the exit code 1
+FAIL_ON = {"error": [ERROR], "warning": [ERROR, WARNING], "never": []}
+
+
+class Finding(NamedTuple):
+    date: object
+    row: int
+    pair: int
+    kind: str
+    severity: str
+
+    @property
+    def message(self) -> str:
+        return MESSAGES[self.kind].format(pair=self.pair)
+
+    def as_dict(self) -> dict:
+        return {
+            "date": self.date.isoformat(),
+            "row": self.row,
+            "pair": self.pair,
+            "kind": self.kind,
+            "severity": self.severity,
+            "message": self.message,
+        }
+
+
+class Diagnostics:
+    """
+    Parameters:
+    checked - number of days looked at, for the summary
+    """
+    def __init__(self, checked: int = None):
+        self.findings = []
+        self.checked = checked
+
+    def add(self, date_target, row, pair, kind: str):
+        """Record a finding, pair is None for findings about the whole day"""
+        if hasattr(date_target, "date"):
+            date_target = date_target.date()
+        self.findings.append(Finding(date_target, row, pair, kind, SEVERITY[kind]))
+
+    def extend(self, findings: list, first_row: int, dates: list):
+        """Record the (offset, pair, kind) findings of checker.check_columns/check_incremental, dates[offset] is the date of the row"""
+        for offset, pair, kind in findings:
+            self.add(dates[offset], first_row + offset, pair, kind)
+
+    def count(self, severity: str) -> int:
+        return sum(1 for finding in self.findings if finding.severity == severity)
+
+    def exit_code(self, fail_on: str) -> int:
+        return 1 if any(finding.severity in FAIL_ON[fail_on] for finding in self.findings) else 0
+
+    def summary(self) -> str:
+        errors, warnings = self.count(ERROR), self.count(WARNING)
+        line = f"{errors} error{'s' * (errors != 1)}, {warnings} warning{'s' * (warnings != 1)}"
+        if self.checked is not None:
+            line += f" in {self.checked} days"
+        kinds = {}
+        for finding in self.findings:
+            kinds[finding.kind] = kinds.get(finding.kind, 0) + 1
+        return "\n".join([line] + [f"  {kind:<14} {n:>5}  {SEVERITY[kind]}" for kind, n in kinds.items()])
+
+    def render(self, fmt: str = "text", plain: bool = False, out=None):
+        """
+        Write all the findings at once.
+
+        Parameters:
+        fmt - text, table, json or summary
+        plain - no rich at all, e.g. for scripts and slow terminals (text only, the rest is always plain)
+        out - stream for the plain output (default: stdout)
+        """
+        out = out or sys.stdout
+        if fmt == "json":
+            data = {
+                "findings": [finding.as_dict() for finding in self.findings],
+                "errors": self.count(ERROR),
+                "warnings": self.count(WARNING),
+                "checked": self.checked,
+            }
+            out.write(json.dumps(data, indent=2) + "\n")
+        elif fmt == "summary":
+            out.write(self.summary() + "\n")
+        elif fmt == "table":
+            from tabulate import tabulate
+
+            table = [[f.date.strftime("%d/%m/%Y"), f.row or "", f.pair or "", f.severity, f.kind, f.message] for f in self.findings]
+            if table:
+                out.write(tabulate(table, headers=["Date", "Row", "Pair", "Severity", "Kind", "Message"], tablefmt="grid") + "\n")
+            out.write(self.summary().split("\n")[0] + "\n")
+        elif plain:
+            out.write("".join(f"{f.severity}: ({f.date.strftime('%d/%m/%Y')}) {f.message}\n" for f in self.findings))
+        else:
+            from .print import messages
+
+            messages([(f.severity, f"({f.date.strftime('%d/%m/%Y')}) {f.message}") for f in self.findings])
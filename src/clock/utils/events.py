@@ -0,0 +1,263 @@
+"""
+Clock events from badge-reader CSV exports, calendar ICS files and logs
+
+Sources are read as a pipeline of generators, one line at a time:
+
+    parse -> pair in/out punches -> split at midnight -> per-day merge -> cap
+
+parse yields either punches ("in"/"out" at a datetime) or intervals (start,
+end), pairing turns the punches into intervals, and DayAccumulator keeps the
+merged, sorted intervals of each day of the sheet. Only the days of the
+sheet are kept, so memory does not grow with the length of the source.
+
+Supported inputs:
+    CSV  with a header holding either start,end (datetimes, or times with a
+         date column) or timestamp,direction (or date,time,direction)
+    ICS  VEVENTs with a DTSTART and DTEND (all-day events are skipped)
+    log  lines starting with a timestamp followed somewhere by in or out,
+         e.g. "2026-01-15 09:02 badge in"
+"""
+import csv
+import re
+from bisect import insort
+from datetime import date, datetime, time, timedelta, timezone
+
+IN = "in"
+OUT = "out"
+DIRECTIONS = {
+    "in": IN, "i": IN, "kommen": IN, "come": IN, "enter": IN, "entry": IN, "clock in": IN,
+    "out": OUT, "o": OUT, "gehen": OUT, "go": OUT, "leave": OUT, "exit": OUT, "clock out": OUT,
+}
+
+_LOG_LINE = re.compile(r"^\s*(\d{4}-\d{2}-\d{2}[T ]\d{1,2}:\d{2}(?::\d{2})?)\b.*?\b(in|out)\b", re.IGNORECASE)
+
+
+def parse_datetime(text: str) -> datetime:
+    text = text.strip()
+    try:
+        # ISO is by far the most common and much faster than strptime
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M",
+                "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date and time '{text}'")
+
+
+def _parse_day(text: str) -> date:
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y"):
+        try:
+            return datetime.strptime(text.strip(), fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{text}'")
+
+
+def _parse_time(text: str) -> time:
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.strptime(text.strip(), fmt).time()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid time '{text}'")
+
+
+def parse_csv(lines, problems: list):
+    """Yield (line number, ("punch", datetime, direction) or ("interval", start, end))"""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    # Excel exports start with a byte order mark, which stdin does not strip
+    fields = {name.lstrip("\ufeff").strip().lower(): name for name in reader.fieldnames}
+
+    def get(record, name):
+        if name not in fields:
+            raise ValueError(f"missing column {name}")
+        return record[fields[name]] or ""
+
+    for record in reader:
+        n = reader.line_num
+        try:
+            if "start" in fields and "end" in fields:
+                if "date" in fields:
+                    day = _parse_day(get(record, "date"))
+                    start = datetime.combine(day, _parse_time(get(record, "start")))
+                    end = datetime.combine(day, _parse_time(get(record, "end")))
+                    # A shift over midnight
+                    if end < start:
+                        end += timedelta(days=1)
+                else:
+                    start, end = parse_datetime(get(record, "start")), parse_datetime(get(record, "end"))
+                yield n, ("interval", start, end)
+                continue
+
+            direction_field = next((name for name in ("direction", "type", "event", "action") if name in fields), None)
+            if direction_field is None:
+                raise ValueError("CSV needs start,end or timestamp,direction columns")
+            direction = DIRECTIONS.get(get(record, direction_field).strip().lower())
+            if direction is None:
+                raise ValueError(f"Unknown direction '{get(record, direction_field)}'")
+            if "timestamp" in fields:
+                moment = parse_datetime(get(record, "timestamp"))
+            else:
+                moment = datetime.combine(_parse_day(get(record, "date")), _parse_time(get(record, "time")))
+            yield n, ("punch", moment, direction)
+        except (ValueError, KeyError) as e:
+            problems.append(f"line {n}: {e}")
+
+
+def _unfold(lines):
+    """ICS continuation lines start with a space or a tab"""
+    n, current = 0, None
+    for n, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield n - 1, current
+        current = line
+    if current is not None:
+        yield n, current
+
+
+def _ics_datetime(name_params: str, value: str):
+    """Local naive datetime of a DTSTART/DTEND, None for all-day values"""
+    if "VALUE=DATE" in name_params.upper() and "VALUE=DATE-TIME" not in name_params.upper():
+        return None
+    value = value.strip()
+    if len(value) == 8:
+        return None
+    utc = value.endswith("Z")
+    moment = datetime.strptime(value.rstrip("Z")[:15], "%Y%m%dT%H%M%S")
+    if utc:
+        moment = moment.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    # TZID is taken as local time, which is what a work calendar uses
+    return moment
+
+
+def parse_ics(lines, problems: list):
+    """Yield (line number, ("interval", start, end)) for every timed VEVENT"""
+    start = end = None
+    in_event = False
+    for n, line in _unfold(lines):
+        upper = line.upper()
+        if upper == "BEGIN:VEVENT":
+            in_event, start, end = True, None, None
+        elif upper == "END:VEVENT":
+            in_event = False
+            if start is not None and end is not None:
+                yield n, ("interval", start, end)
+        elif in_event and ":" in line:
+            name_params, value = line.split(":", 1)
+            name = name_params.split(";", 1)[0].upper()
+            try:
+                if name == "DTSTART":
+                    start = _ics_datetime(name_params, value)
+                elif name == "DTEND":
+                    end = _ics_datetime(name_params, value)
+            except ValueError:
+                problems.append(f"line {n}: invalid {name} '{value.strip()}'")
+
+
+def parse_log(lines, problems: list):
+    """Yield (line number, ("punch", datetime, direction)), lines without a timestamp and in/out are skipped"""
+    for n, line in enumerate(lines, start=1):
+        match = _LOG_LINE.match(line)
+        if not match:
+            continue
+        try:
+            yield n, ("punch", parse_datetime(match.group(1)), match.group(2).lower())
+        except ValueError as e:
+            problems.append(f"line {n}: {e}")
+
+
+PARSERS = {"csv": parse_csv, "ics": parse_ics, "log": parse_log}
+
+
+def pair_punches(records, problems: list):
+    """Turn in/out punches into intervals, intervals pass through. Unmatched punches go to problems."""
+    opened = None
+    for n, record in records:
+        if record[0] == "interval":
+            yield n, record[1], record[2]
+            continue
+        _, moment, direction = record
+        if direction == IN:
+            if opened is not None:
+                problems.append(f"line {opened[0]}: clock in at {opened[1]:%d/%m/%Y %H:%M} without clock out")
+            opened = (n, moment)
+        elif opened is None:
+            problems.append(f"line {n}: clock out at {moment:%d/%m/%Y %H:%M} without clock in")
+        else:
+            yield n, opened[1], moment
+            opened = None
+    if opened is not None:
+        problems.append(f"line {opened[0]}: clock in at {opened[1]:%d/%m/%Y %H:%M} without clock out")
+
+
+def split_days(intervals, problems: list):
+    """
+    Yield (day, start, end) with times rounded to the minute, intervals over midnight
+    are split (the sheet has one row per day, 24:00 is written as 23:59).
+    """
+    for n, start, end in intervals:
+        if end < start:
+            problems.append(f"line {n}: ends ({end:%d/%m/%Y %H:%M}) before it starts ({start:%d/%m/%Y %H:%M})")
+            continue
+        start = start.replace(second=0, microsecond=0)
+        end = end.replace(second=0, microsecond=0)
+        while start < end:
+            midnight = datetime.combine(start.date() + timedelta(days=1), time(0))
+            piece_end = min(end, midnight)
+            last = time(23, 59) if piece_end == midnight else piece_end.time()
+            if start.time() < last:
+                yield start.date(), start.time(), last
+            start = piece_end
+
+
+class DayAccumulator:
+    """Merged, sorted intervals per day, kept only for the days accepted by keep(day)"""
+    def __init__(self, keep):
+        self.keep = keep
+        self.days = {}
+        self.skipped_days = set()
+        self.intervals = 0
+
+    def add(self, day: date, start: time, end: time):
+        if not self.keep(day):
+            self.skipped_days.add(day)
+            return
+        self.intervals += 1
+        intervals = self.days.setdefault(day, [])
+        insort(intervals, (start, end))
+        # Merge overlapping and touching intervals
+        merged = []
+        for s, e in intervals:
+            if merged and s <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+            else:
+                merged.append((s, e))
+        self.days[day] = merged
+
+
+def cap(intervals: list, n_pairs: int):
+    """
+    Keep the first n_pairs intervals of a day, the sheet has no room for more.
+
+    Returns:
+        the kept intervals, list of the (start, end) intervals that were dropped
+    """
+    return list(intervals[:n_pairs]), list(intervals[n_pairs:])
+
+
+def read(lines, fmt: str, keep, problems: list) -> DayAccumulator:
+    """Run the whole pipeline over the lines of a source of format fmt (csv, ics or log)"""
+    days = DayAccumulator(keep)
+    for day, start, end in split_days(pair_punches(PARSERS[fmt](lines, problems), problems), problems):
+        days.add(day, start, end)
+    return days
@@ -1,9 +1,28 @@
+import hashlib
 from pathlib import Path
 
 from .time import get_today_dict
 
 EXCEL_FILE = Path.home() / f"Zeiterfassungstabelle {get_today_dict()['year']} Doktorand_innen.xlsx"
+CACHE_DIR = Path.home() / ".cache" / "desyclock"
+# Unlike the caches, what is in here is not in the xlsx file (yet)
+DATA_DIR = Path.home() / ".local" / "share" / "desyclock"
 
 
 def excel_file_exists():
-    return (EXCEL_FILE).is_file()
\ No newline at end of file
+    return (EXCEL_FILE).is_file()
+
+def excel_files():
+    """Return the time sheets of every year found in $HOME, oldest first"""
+    return sorted(Path.home().glob("Zeiterfassungstabelle * Doktorand_innen.xlsx"))
+
+def fingerprint(path=EXCEL_FILE):
+    """Return (mtime_ns, size) of a file, used to invalidate the sidecar caches"""
+    stat = Path(path).stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+def cache_file(path, suffix, directory=CACHE_DIR):
+    """Return the sidecar cache location for a workbook, e.g. cache_file(EXCEL_FILE, "index.json")"""
+    path = Path(path).resolve()
+    key = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    return directory / f"{path.stem}.{key}.{suffix}"
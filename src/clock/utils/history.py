@@ -0,0 +1,133 @@
+"""
+History of every year's time sheet in a SQLite database
+
+All the workbooks found in $HOME (see file.excel_files) are ingested into one
+table with a row per day, keyed by the date ordinal, plus a table of the check
+findings. Ingest only re-reads the files whose fingerprint changed since the
+last run, so queries spanning several years are answered from the indexed
+tables instead of parsing several xlsx files.
+"""
+import sqlite3
+from datetime import date, datetime
+
+from .checker import check_columns, load_columns
+from .file import CACHE_DIR, excel_files, fingerprint
+
+DATABASE = CACHE_DIR / "history.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS days (
+    day INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    comment TEXT,
+    seconds INTEGER NOT NULL,
+    pairs INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS days_path ON days (path);
+CREATE TABLE IF NOT EXISTS issues (
+    day INTEGER NOT NULL,
+    pair INTEGER,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_kind_day ON issues (kind, day);
+CREATE INDEX IF NOT EXISTS issues_day ON issues (day);
+CREATE INDEX IF NOT EXISTS issues_path ON issues (path);
+"""
+
+
+def connect(database=DATABASE) -> sqlite3.Connection:
+    database.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(database)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _forget(conn, path: str):
+    conn.execute("DELETE FROM days WHERE path = ?", (path,))
+    conn.execute("DELETE FROM issues WHERE path = ?", (path,))
+    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+
+def ingest_file(conn, path, fp: list):
+    """Replace everything stored for the workbook at path, in one transaction"""
+    from .sheet import SheetReader
+
+    s = SheetReader(path)
+    first, last = s.DATE_ROW_FIRST, s.max_row
+    dates, comments, starts, ends = load_columns(s, first, last)
+
+    # Footer rows after the calendar have no date (and no record)
+    days = [
+        (record.date.toordinal(), str(path), first + offset, record.comment, record.total * 60, len(record))
+        for offset, record in enumerate(s.records(first, last))
+        if record is not None
+    ]
+
+    issues = [
+        (dates[offset].toordinal(), pair, kind, str(path))
+        for offset, pair, kind in check_columns(dates, comments, starts, ends)
+        if isinstance(dates[offset], datetime)
+    ]
+
+    with conn:
+        _forget(conn, str(path))
+        conn.executemany("INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?, ?)", days)
+        conn.executemany("INSERT INTO issues VALUES (?, ?, ?, ?)", issues)
+        conn.execute("INSERT INTO files VALUES (?, ?, ?)", (str(path), *fp))
+
+
+def ingest(conn, paths=None) -> list:
+    """
+    Bring the store up to date with the workbooks (default: all of them in $HOME).
+
+    Returns:
+        list of the paths that were (re-)read
+    """
+    paths = excel_files() if paths is None else paths
+    known = {path: [mtime_ns, size] for path, mtime_ns, size in conn.execute("SELECT * FROM files")}
+
+    read = []
+    for path in paths:
+        fp = fingerprint(path)
+        if known.pop(str(path), None) != fp:
+            ingest_file(conn, path, fp)
+            read.append(path)
+
+    # Workbooks that are gone
+    with conn:
+        for path in known:
+            _forget(conn, path)
+    return read
+
+
+def totals(conn, first: date, last: date):
+    """
+    Returns:
+        seconds worked and number of days with work between first and last, inclusive
+    """
+    seconds, days = conn.execute(
+        "SELECT COALESCE(SUM(seconds), 0), COUNT(*) FROM days WHERE day BETWEEN ? AND ? AND seconds > 0",
+        (first.toordinal(), last.toordinal()),
+    ).fetchone()
+    return seconds, days
+
+
+def issues(conn, first: date, last: date, kinds=None) -> list:
+    """
+    Returns:
+        list of (date, pair, kind) between first and last, in the order of the check
+    """
+    query = "SELECT day, pair, kind FROM issues WHERE day BETWEEN ? AND ?"
+    params = [first.toordinal(), last.toordinal()]
+    if kinds:
+        query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+        params += kinds
+    query += " ORDER BY day, pair IS NULL, pair"
+    return [(date.fromordinal(day), pair, kind) for day, pair, kind in conn.execute(query, params)]
@@ -0,0 +1,118 @@
+"""
+Date -> row index of the time sheet
+
+The sheet keeps one row per calendar day, so in the common case a lookup is
+plain arithmetic from the first date row. If the rows are not contiguous
+(missing days, extra rows in between) we fall back to a binary search.
+The index is stored next to the other caches and reused as long as the
+workbook fingerprint and the date column it was built from do not change.
+"""
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime
+
+from .file import cache_file, fingerprint
+
+
+class DateIndex:
+    def __init__(self, first_row, first_ordinal, count, pairs=None):
+        self.first_row = first_row
+        self.first_ordinal = first_ordinal
+        self.count = count
+        # pairs is None for a contiguous calendar, otherwise sorted (ordinal, row)
+        self.pairs = pairs
+        self.ordinals = [p[0] for p in pairs] if pairs is not None else None
+
+    @classmethod
+    def build(cls, dates, first_row=1):
+        """
+        Build the index in a single pass.
+
+        Parameters:
+        dates - iterable of the date column values, starting at first_row
+        first_row - row number of the first value
+        """
+        pairs = []
+        row = first_row - 1
+        for row, value in enumerate(dates, start=first_row):
+            if isinstance(value, datetime):
+                value = value.date()
+            if isinstance(value, date):
+                pairs.append((value.toordinal(), row))
+
+        if not pairs:
+            # No dates at all, point past the last row like the old scan did
+            return cls(row + 1, 0, 0, [])
+
+        first_ordinal, date_row_first = pairs[0]
+        contiguous = all(o == first_ordinal + i and r == date_row_first + i for i, (o, r) in enumerate(pairs))
+        if contiguous:
+            return cls(date_row_first, first_ordinal, len(pairs))
+
+        # Keep the first row of duplicated dates, like a top-down scan would
+        return cls(date_row_first, first_ordinal, len(pairs), sorted(pairs))
+
+    @property
+    def contiguous(self):
+        return self.pairs is None
+
+    def lookup(self, target_date: date) -> int:
+        """Return the row of target_date, 0 if not found"""
+        ordinal = target_date.toordinal()
+
+        if self.contiguous:
+            offset = ordinal - self.first_ordinal
+            return self.first_row + offset if 0 <= offset < self.count else 0
+
+        i = bisect_left(self.ordinals, ordinal)
+        if i < len(self.pairs) and self.pairs[i][0] == ordinal:
+            return self.pairs[i][1]
+        return 0
+
+    def rows_between(self, first: date, last: date):
+        """Return the rows of the dates from first to last (inclusive) that are in the sheet, in date order"""
+        if self.contiguous:
+            low = max(first.toordinal() - self.first_ordinal, 0)
+            high = min(last.toordinal() - self.first_ordinal, self.count - 1)
+            return range(self.first_row + low, self.first_row + high + 1)
+
+        i = bisect_left(self.ordinals, first.toordinal())
+        j = bisect_right(self.ordinals, last.toordinal())
+        rows, seen = [], set()
+        for ordinal, row in self.pairs[i:j]:
+            if ordinal not in seen:
+                seen.add(ordinal)
+                rows.append(row)
+        return rows
+
+    @classmethod
+    def load(cls, path, date_column: int):
+        """Return the stored index of the workbook at path built from date_column, None if missing or stale"""
+        try:
+            with open(cache_file(path, "index.json")) as f:
+                data = json.load(f)
+            if data["fingerprint"] != fingerprint(path) or data["date_column"] != date_column:
+                return None
+            pairs = [tuple(p) for p in data["pairs"]] if data["pairs"] is not None else None
+            return cls(data["first_row"], data["first_ordinal"], data["count"], pairs)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, path, date_column: int, fp=None):
+        """Store the index of date_column for the version fp (default: the current one) of the workbook at path"""
+        data = {
+            "fingerprint": fp or fingerprint(path),
+            "date_column": date_column,
+            "first_row": self.first_row,
+            "first_ordinal": self.first_ordinal,
+            "count": self.count,
+            "pairs": self.pairs,
+        }
+        target = cache_file(path, "index.json")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "w") as f:
+                json.dump(data, f)
+        except OSError:
+            # A cache we cannot write is just a cache we do not have
+            pass
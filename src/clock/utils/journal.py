@@ -0,0 +1,137 @@
+"""
+Append-only journal of clock events
+
+In journal mode (setting "journal", see utils/config.py) `clock in`, `clock out`
+and `clock clear` only append a record to the journal, which is fast and never
+touches the xlsx file. `clock sync`, or reaching "journal_threshold" pending
+records, replays them into the workbook with the same rules as the commands
+and saves once. Appending and syncing both hold the lock of the workbook
+(utils/lock.py), so no record arrives while the journal is replayed.
+"""
+import json
+import os
+from datetime import date, datetime, time
+
+from . import config, lock, status
+from .file import DATA_DIR, EXCEL_FILE
+from .rules import RuleError, clock_in_slot, clock_out_slot
+
+JOURNAL = DATA_DIR / f"{EXCEL_FILE.stem}.journal.jsonl"
+# Records being replayed, kept until the workbook is saved
+SYNCING = JOURNAL.with_suffix(".syncing")
+
+
+def enabled() -> bool:
+    return bool(config.get("journal", False))
+
+
+def append(op: str, date_target: date, time_target: time = None):
+    """Durably append a record: op is "in", "out" or "clear" """
+    record = {"ts": datetime.now().isoformat(timespec="seconds"), "op": op, "date": date_target.isoformat()}
+    if time_target is not None:
+        record["time"] = time_target.isoformat()
+
+    with lock.locked(EXCEL_FILE):
+        before = status.read()
+        JOURNAL.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(JOURNAL, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, json.dumps(record).encode() + b"\n")
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        status.journaled(before, op, date_target, time_target)
+
+
+def _read(path) -> list:
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Torn write of a crashed append, there is nothing to recover
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def pending() -> list:
+    """Return the records not yet in the workbook, oldest first"""
+    return _read(SYNCING) + _read(JOURNAL)
+
+
+def replay(s, records: list) -> list:
+    """
+    Apply records to a Sheet (without saving).
+
+    Returns:
+        list of (record, reason) of the records that were rejected
+    """
+    rejected = []
+    if records:
+        s.replayed += len(records)
+    for record in records:
+        date_target = date.fromisoformat(record["date"])
+        row = s.date_to_row(date_target)
+        if not row:
+            rejected.append((record, f"Date {date_target} not found"))
+            continue
+
+        if record["op"] == "clear":
+            for work_column in s.WORK_COLUMNS:
+                s.set_value(row, work_column["start"], None)
+                s.set_value(row, work_column["end"], None)
+            continue
+
+        time_target = time.fromisoformat(record["time"])
+        day_record = s.get_work_hours(row)
+        try:
+            if record["op"] == "in":
+                slot = clock_in_slot(day_record, time_target, len(s.WORK_COLUMNS))
+                s.set_value(row, s.WORK_COLUMNS[slot]["start"], time_target)
+            else:
+                slot = clock_out_slot(day_record, time_target)
+                s.set_value(row, s.WORK_COLUMNS[slot]["end"], time_target)
+        except RuleError as e:
+            rejected.append((record, str(e)))
+
+    return rejected
+
+
+def sync():
+    """
+    Replay the pending records into the workbook with a single save.
+
+    Returns:
+        number of records replayed, list of (record, reason) of the rejected ones
+    """
+    from .sheet import Sheet
+
+    with lock.locked(EXCEL_FILE):
+        # Records of a sync that did not get to save come first
+        if JOURNAL.exists():
+            if SYNCING.exists():
+                with open(JOURNAL, "rb") as src, open(SYNCING, "ab") as dst:
+                    dst.write(src.read())
+                JOURNAL.unlink()
+            else:
+                JOURNAL.rename(SYNCING)
+
+        records = _read(SYNCING)
+        if not records:
+            SYNCING.unlink(missing_ok=True)
+            return 0, []
+
+        s = Sheet()
+        rejected = replay(s, records)
+        s.save()
+        SYNCING.unlink()
+    return len(records), rejected
+
+
+def threshold_reached() -> bool:
+    threshold = config.get("journal_threshold", 0)
+    return bool(threshold) and len(pending()) >= threshold
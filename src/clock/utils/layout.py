@@ -0,0 +1,149 @@
+"""
+Layout of the time sheet: which sheet and columns hold the dates, comments and work times
+
+The layout is detected from the workbook the first time it is opened: the
+date column is the one where consecutive rows hold consecutive days, the
+header row is the closest row above the first date with start/end labels,
+and every start label followed by an end label is a work pair. The result
+is cached next to the other caches, keyed by the workbook fingerprint, so
+later runs skip the detection. Whatever cannot be detected falls back to the
+institute template, shifted by as many columns as the date column moved.
+
+The layout can also be pinned in the config file, e.g.
+    {"layout": {"date_column": 4, "comment_column": 6, "work_columns": [[7, 8], [9, 10]]}}
+keys not given there take the template values and nothing is detected.
+"""
+import json
+import re
+from datetime import date, datetime, timedelta
+
+from . import config
+from .file import cache_file
+
+# The institute template
+DEFAULT = {
+    "sheet": "Time Recording",
+    "date_column": 4,
+    "comment_column": 6,
+    "header_row": 5,
+    "work_columns": [[7, 8], [9, 10], [11, 12], [13, 14]],
+}
+
+# Only the top left of a sheet is looked at
+SCAN_ROWS = 60
+SCAN_COLUMNS = 40
+
+START_LABELS = {"start", "begin", "beginn", "arbeitsbeginn", "kommen", "arrival", "von", "from", "in"}
+END_LABELS = {"end", "ende", "arbeitsende", "gehen", "leave", "departure", "bis", "to", "out"}
+COMMENT_LABELS = {"comment", "comments", "bemerkung", "bemerkungen", "kommentar", "remark", "remarks", "note", "notes"}
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def pinned():
+    """The layout of the config file on top of DEFAULT, None if it is not set"""
+    layout = config.get("layout")
+    if not layout:
+        return None
+    return {**DEFAULT, **layout}
+
+
+def cached(path, fp: list):
+    try:
+        with open(cache_file(path, "layout.json")) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("fingerprint") != fp:
+        return None
+    return data["layout"]
+
+
+def store(path, fp: list, layout: dict):
+    target = cache_file(path, "layout.json")
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, "w") as f:
+            json.dump({"fingerprint": fp, "layout": layout}, f)
+    except OSError:
+        pass
+
+
+def known(path, fp: list):
+    """The pinned or cached layout of the workbook at path, None if it has to be detected"""
+    return pinned() or cached(path, fp)
+
+
+def _labels(value) -> set:
+    return set(_WORD.findall(value.lower())) if isinstance(value, str) else set()
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else None
+
+
+def detect_rows(rows: list):
+    """
+    Layout of a sheet given its first rows (tuples of values from column 1), None without a date column.
+    """
+    # Date column: two rows in a row with consecutive days
+    found = None
+    for i in range(len(rows) - 1):
+        for j in range(min(len(rows[i]), len(rows[i + 1]))):
+            day = _as_date(rows[i][j])
+            if day is not None and _as_date(rows[i + 1][j]) == day + timedelta(days=1):
+                found = (i, j)
+                break
+        if found:
+            break
+    if found is None:
+        return None
+    first_date_row, date_column = found[0] + 1, found[1] + 1
+
+    # Template columns moved along with the date column
+    shift = date_column - DEFAULT["date_column"]
+    layout = {
+        "date_column": date_column,
+        "comment_column": DEFAULT["comment_column"] + shift,
+        "header_row": first_date_row - 1,
+        "work_columns": [[start + shift, end + shift] for start, end in DEFAULT["work_columns"]],
+    }
+
+    for i in range(first_date_row - 2, -1, -1):
+        labels = [_labels(value) for value in rows[i]]
+        if not any(label & START_LABELS for label in labels) or not any(label & END_LABELS for label in labels):
+            continue
+
+        pairs, start = [], None
+        for column, label in enumerate(labels, start=1):
+            if column <= date_column:
+                continue
+            if label & START_LABELS:
+                start = column
+            elif label & END_LABELS and start is not None:
+                pairs.append([start, column])
+                start = None
+        if pairs:
+            layout["header_row"] = i + 1
+            layout["work_columns"] = pairs
+            # The comment header may sit in another header row, look from here up
+            for k in range(i, -1, -1):
+                comment = next((column for column, value in enumerate(rows[k], start=1) if _labels(value) & COMMENT_LABELS), None)
+                if comment:
+                    layout["comment_column"] = comment
+                    break
+        break
+    return layout
+
+
+def detect(workbook) -> dict:
+    """Layout of an openpyxl workbook, the template sheet first, DEFAULT if nothing looks like a time sheet"""
+    names = sorted(workbook.sheetnames, key=lambda name: name != DEFAULT["sheet"])
+    for name in names:
+        rows = list(workbook[name].iter_rows(max_row=SCAN_ROWS, max_col=SCAN_COLUMNS, values_only=True))
+        layout = detect_rows(rows)
+        if layout is not None:
+            return {"sheet": name, **layout}
+    return dict(DEFAULT)
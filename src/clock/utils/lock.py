@@ -0,0 +1,93 @@
+"""
+Cross-process locking and write coalescing
+
+The commands that change the sheet hold an exclusive lock on the workbook
+from before they read it until their save (Sheet.editing), so what they
+checked, e.g. that you are not clocked in already, is still true when they
+write. The lock is reentrant within a process.
+
+Every save goes through a spool: the writer first drops its cell edits in
+the spool directory, then takes the lock. Whoever holds the lock applies all
+the spooled edits in one save, so writers that queued up behind it (e.g. the
+flush of `clock serve`) find their edits already saved and return without
+touching the file. Edits of different cells are all kept, for the same cell
+the most recent writer wins. A writer whose save fails drops its entry, and
+entries left by writers that died are dropped by the next one.
+"""
+import contextlib
+import fcntl
+import os
+import pickle
+import time
+
+from .file import DATA_DIR, cache_file
+
+# Lock files held by this process and how many times, flock would wait on itself
+_held = {}
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold the exclusive advisory lock of the workbook at path"""
+    lock_file = cache_file(path, "lock")
+    if lock_file in _held:
+        _held[lock_file] += 1
+        try:
+            yield
+        finally:
+            _held[lock_file] -= 1
+        return
+
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        _held[lock_file] = 1
+        yield
+    finally:
+        _held.pop(lock_file, None)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def spool_dir(path):
+    return cache_file(path, "spool", DATA_DIR)
+
+
+def spool(path, edits: dict, number_formats: dict):
+    """Queue edits for the workbook at path, return the spool entry"""
+    directory = spool_dir(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Names sort in arrival order
+    entry = directory / f"{time.time_ns():020d}-{os.getpid()}.edits"
+    tmp = entry.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump((edits, number_formats), f)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp.replace(entry)
+    return entry
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def drain(path) -> list:
+    """Return the queued (entry, edits, number_formats), oldest first. Call with the lock held."""
+    entries = []
+    for entry in sorted(spool_dir(path).glob("*.edits")):
+        # Nobody is waiting for the edits of a writer that was killed, they would land in an unrelated save
+        if not _alive(int(entry.stem.rsplit("-", 1)[1])):
+            entry.unlink()
+            continue
+        with open(entry, "rb") as f:
+            edits, number_formats = pickle.load(f)
+        entries.append((entry, edits, number_formats))
+    return entries
@@ -7,10 +7,12 @@ Provides:
 - success()
 - info()
 - rainbow()
+- messages()
 """
 
-from rich.console import Console
-from rich.text import Text
+from functools import lru_cache
+
+from . import profiling
 
 __all__ = [
     "error",
@@ -18,37 +20,59 @@ __all__ = [
     "success",
     "info",
     "rainbow",
+    "messages",
 ]
 
-_console = Console()
+# Markup in front of each kind of message
+PREFIXES = {
+    "error": "[bold red]✖[/bold red]",
+    "warning": "[bold yellow]⚠[/bold yellow]",
+    "success": "[bold green]✔[/bold green]",
+    "info": "[cyan]ℹ INFO:[/cyan]",
+}
+
+@lru_cache(maxsize=None)
+def _console():
+    # rich is slow to import, only pay for it when something is printed
+    with profiling.phase("import"):
+        from rich.console import Console
+    return Console()
 
 
 def error(msg: str) -> None:
     """Print an error message."""
-    _console.print(f"[bold red]✖[/bold red] {msg}")
+    _console().print(f"{PREFIXES['error']} {msg}")
 
 
 def warn(msg: str) -> None:
     """Print a warning message."""
-    _console.print(f"[bold yellow]⚠[/bold yellow] {msg}")
+    _console().print(f"{PREFIXES['warning']} {msg}")
 
 
 def success(msg: str) -> None:
     """Print a success message."""
-    _console.print(f"[bold green]✔[/bold green] {msg}")
+    _console().print(f"{PREFIXES['success']} {msg}")
 
 
 def info(msg: str) -> None:
     """Print an informational message."""
-    _console.print(f"[cyan]ℹ INFO:[/cyan] {msg}")
+    _console().print(f"{PREFIXES['info']} {msg}")
+
+
+def messages(entries: list) -> None:
+    """Print many (kind, message) at once, kind is error, warning, success or info."""
+    if entries:
+        _console().print("\n".join(f"{PREFIXES[kind]} {msg}" for kind, msg in entries))
 
 
 def rainbow(msg: str) -> None:
     """Print a rainbow-colored message (character-by-character)."""
+    from rich.text import Text
+
     colors = ["red", "yellow", "green", "cyan", "blue", "magenta"]
     text = Text()
 
     for i, char in enumerate(msg):
         text.append(char, style=colors[i % len(colors)])
 
-    _console.print(text)
\ No newline at end of file
+    _console().print(text)
\ No newline at end of file
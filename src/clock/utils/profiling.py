@@ -0,0 +1,106 @@
+"""
+Phase timing of a command
+
+With `clock --profile ...` (or CLOCK_PROFILE=1) the phases of the command
+(imports, workbook load, date lookup, work hours, rendering, save) record
+their wall time and the peak memory of the process. At exit a breakdown is
+printed to stderr and/or a json line is appended to a file, and the whole
+run can also be dumped as cProfile stats. When profiling is off a phase
+costs one check.
+
+Memory is the high-water mark of the process (getrusage), which is cheap
+enough not to distort the timings and includes what C extensions allocate:
+"peak" is the mark at the end of the phase, "grew" how much the phase
+raised it.
+"""
+import functools
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+_enabled = False
+_stack = []
+# "outer/inner" phase path -> [calls, seconds, peak KiB, grew KiB], in the order the phases started
+_phases = {}
+_start = None
+
+
+def max_rss_kb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB on Linux
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def start():
+    global _enabled, _start
+    _enabled = True
+    _start = time.perf_counter()
+
+
+@contextmanager
+def phase(name: str):
+    if not _enabled:
+        yield
+        return
+
+    _stack.append(name)
+    record = _phases.setdefault("/".join(_stack), [0, 0.0, 0, 0])
+    rss = max_rss_kb()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        peak = max_rss_kb()
+        _stack.pop()
+        record[0] += 1
+        record[1] += elapsed
+        record[2] = max(record[2], peak)
+        record[3] += peak - rss
+
+
+def timed(name: str):
+    """Decorator running the function as the phase name"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def results(argv: list) -> dict:
+    return {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "argv": argv,
+        "total_ms": (time.perf_counter() - _start) * 1000,
+        "peak_kb": max_rss_kb(),
+        "phases": {
+            path: {"calls": calls, "ms": seconds * 1000, "peak_kb": peak, "grew_kb": grew}
+            for path, (calls, seconds, peak, grew) in _phases.items()
+        },
+    }
+
+
+def print_breakdown(data: dict, file=sys.stderr):
+    print(f"{'phase':<28} {'calls':>6} {'ms':>10} {'peak KiB':>10} {'grew KiB':>10}", file=file)
+    for path, phase_data in data["phases"].items():
+        label = "  " * path.count("/") + path.rsplit("/", 1)[-1]
+        print(f"{label:<28} {phase_data['calls']:>6} {phase_data['ms']:>10.2f} "
+              f"{phase_data['peak_kb']:>10.0f} {phase_data['grew_kb']:>10.0f}", file=file)
+    print(f"{'total':<28} {'':>6} {data['total_ms']:>10.2f} {data['peak_kb']:>10.0f}", file=file)
+
+
+def write_json_line(data: dict, path):
+    with open(path, "a") as f:
+        f.write(json.dumps(data) + "\n")
@@ -1,11 +1,64 @@
 import random
 from datetime import time
+from statistics import NormalDist
 
 from .time import minutes_to_time, time_to_minutes
 
 
-def gaussian_minutes(mean: int, sigma: float) -> int:
-    return int(random.gauss(mean, sigma))
+def truncated_normal(rng, mean: float, sigma: float, low: float = float("-inf"), high: float = float("inf")) -> float:
+    """
+    Draw from a normal distribution truncated to [low, high] by inverting its cdf,
+    one uniform draw per value instead of rejection sampling.
+    """
+    if sigma <= 0:
+        return min(max(mean, low), high)
+    dist = NormalDist(mean, sigma)
+    u = rng.uniform(dist.cdf(low), dist.cdf(high))
+    # inv_cdf is only defined on the open interval, the bounds are only reached deep in the tails
+    if u <= 0.0:
+        return low
+    if u >= 1.0:
+        return high
+    return min(max(dist.inv_cdf(u), low), high)
+
+
+def generate_times(
+    n: int,
+    rng=random,
+    mean_arrival=time(9, 0),
+    sigma_arrival=20,
+    mean_leave=time(18, 0),
+    sigma_leave=30,
+    lunch_start=time(12, 30),
+    lunch_mean_duration=30,
+    lunch_sigma=5,
+) -> list:
+    """
+    Draw the times of n days at once.
+
+    Parameters:
+    rng - random.Random (or the random module) to draw from, seed it for reproducible days
+
+    Returns:
+        list of (arrival, lunch_start, lunch_end, leave)
+    """
+    lunch_start_min = time_to_minutes(lunch_start)
+
+    # Arrival: at least some work before lunch
+    arrival_high = lunch_start_min - 31
+    arrivals = [int(truncated_normal(rng, time_to_minutes(mean_arrival), sigma_arrival, high=arrival_high)) for _ in range(n)]
+
+    # Lunch duration (>= 15 min)
+    lunch_ends = [lunch_start_min + max(15, int(rng.gauss(lunch_mean_duration, lunch_sigma))) for _ in range(n)]
+
+    # Leave: at least 1h after lunch
+    leaves = [int(truncated_normal(rng, time_to_minutes(mean_leave), sigma_leave, low=lunch_end + 61)) for lunch_end in lunch_ends]
+
+    return [
+        (minutes_to_time(arrival), lunch_start, minutes_to_time(lunch_end), minutes_to_time(leave))
+        for arrival, lunch_end, leave in zip(arrivals, lunch_ends, leaves)
+    ]
+
 
 def generate_day_times(
     mean_arrival=time(9, 0),
@@ -20,38 +73,13 @@ def generate_day_times(
     Returns:
         arrival, lunch_start, lunch_end, leave
     """
-
-    lunch_start_min = time_to_minutes(lunch_start)
-
-    # --- Arrival (must be before lunch)
-    while True:
-        arrival_min = gaussian_minutes(
-            time_to_minutes(mean_arrival),
-            sigma_arrival,
-        )
-        if arrival_min < lunch_start_min - 30:  # at least some work before lunch
-            break
-
-    # --- Lunch duration (>= 15 min)
-    lunch_duration = max(
-        15,
-        gaussian_minutes(lunch_mean_duration, lunch_sigma),
-    )
-
-    lunch_end_min = lunch_start_min + lunch_duration
-
-    # --- Leave (must be after lunch)
-    while True:
-        leave_min = gaussian_minutes(
-            time_to_minutes(mean_leave),
-            sigma_leave,
-        )
-        if leave_min > lunch_end_min + 60:  # at least 1h after lunch
-            break
-
-    return (
-        minutes_to_time(arrival_min),
-        lunch_start,
-        minutes_to_time(lunch_end_min),
-        minutes_to_time(leave_min),
-    )
+    return generate_times(
+        1,
+        mean_arrival=mean_arrival,
+        sigma_arrival=sigma_arrival,
+        mean_leave=mean_leave,
+        sigma_leave=sigma_leave,
+        lunch_start=lunch_start,
+        lunch_mean_duration=lunch_mean_duration,
+        lunch_sigma=lunch_sigma,
+    )[0]
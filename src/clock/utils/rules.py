@@ -0,0 +1,47 @@
+"""
+Rules for clocking in and out, shared by the commands and the journal replay
+
+Times are compared in whole minutes, the precision the sheet shows: clocking
+in during the minute of the last clock out is refused, and clocking out
+during the minute of the clock in is allowed, seconds do not matter.
+"""
+from .time import time_to_minutes
+
+
+class RuleError(Exception):
+    """The clock in/out is not allowed, the message says why"""
+
+
+def clock_in_slot(record, time, n_slots: int) -> int:
+    """
+    Return the index of the work pair a clock in at time goes to.
+
+    Parameters:
+    record - DayRecord of the day, as returned by Sheet.get_work_hours
+    time - clock in time
+    n_slots - number of work pairs of the sheet
+    """
+    # If you have no clocked in today
+    if not record:
+        return 0
+    # If you have not clocked out
+    if record.is_open:
+        raise RuleError("Clock out first")
+    # If the clock in time is earlier than the last clock out time
+    if record.intervals[-1][1] >= time_to_minutes(time):
+        raise RuleError("You cannot clock in before last clock out")
+    # If you run out of slots
+    if len(record) >= n_slots:
+        raise RuleError("You cannot clock in and out more than " + str(n_slots) + " times a day")
+    return len(record)
+
+
+def clock_out_slot(record, time) -> int:
+    """Return the index of the work pair a clock out at time closes"""
+    # If you have not clocked in yet that day
+    if not record:
+        raise RuleError("Clock in first")
+    # Only check is to see if the last clock-in time is earlier that the clock out
+    if record.is_open and record.intervals[-1][0] <= time_to_minutes(time):
+        return len(record) - 1
+    raise RuleError("Could not clock out")
@@ -1,140 +1,452 @@
+import contextlib
+import os
+import shutil
+import tempfile
 import warnings
-from datetime import date, datetime, timedelta
+from datetime import date
+from pathlib import Path
 
-import openpyxl as xl
-from tabulate import tabulate
-
-from ..utils.print import error, info, warn
-from . import cell
-from .file import EXCEL_FILE
-from .time import format_timedelta
+from ..utils.print import error, info
+from . import layout, lock, profiling, status
+from .checker import FLAG_KINDS, day_totals, load_rows
+from .day import DayRecord, format_minutes
+from .diagnostics import Diagnostics
+from .file import EXCEL_FILE, fingerprint
+from .index import DateIndex
+from .snapshot import Snapshot
+from .totals import Totals
+from .xlsx import PatchError, patch_cells
 
 warnings.filterwarnings("ignore", message="DrawingML support is incomplete")
 
 
-class Sheet:
-    def __init__(self):
-        self.SHEET_NAME = 'Time Recording'
-        self.DATE_COLUMN = 4
-        self.COMMENT_COLUMN = 6
-        self.HEADER_ROW = 5
-        self.WORK_COLUMNS = [
-            {"start" : 7, "end" : 8},
-            {"start" : 9, "end" : 10},
-            {"start" : 11, "end" : 12},
-            {"start" : 13, "end" : 14},
-        ]
+class SheetReader:
+    """
+    Read-only view of the time sheet.
+
+    Loads the workbook in openpyxl streaming mode and keeps only the values
+    of the Time Recording sheet, which is all print and check need.
+    Where the dates, comments and work times are comes from utils/layout.py.
+    Use Sheet to modify the file.
+
+    Parameters:
+    path - xlsx file (default: this year's file in $HOME)
+    stream - do not load the rows, only the index; read them with iter_rows
+    """
+    # Sheet kept in memory by `clock serve`, sheets opened inside the daemon share its rows and index
+    resident = None
 
-        self.workbook = xl.load_workbook(EXCEL_FILE)
-        self.sheet = self.workbook[self.SHEET_NAME]
+    def __init__(self, path=None, stream: bool = False):
+        self.path = Path(path) if path else EXCEL_FILE
+
+        resident = SheetReader.resident
+        if resident is not None and resident.path != self.path:
+            resident = None
+        if resident is not None:
+            self.set_layout(resident.layout)
+        else:
+            self.set_layout(layout.known(self.path, fingerprint(self.path)))
+
+        if stream:
+            self.fingerprint = fingerprint(self.path)
+            if self.layout is None:
+                self._workbook().close()
+            self.rows = None
+            self.max_row = 0
+            self.index = DateIndex.load(self.path, self.DATE_COLUMN)
+            if self.index is None:
+                columns = (self.DATE_COLUMN, self.DATE_COLUMN)
+                self.index = DateIndex.build(values[0] for _, values in self._stream_workbook(1, None, columns))
+                self.index.store(self.path, self.DATE_COLUMN, self.fingerprint)
+            self.DATE_ROW_FIRST = self.get_DATE_ROW_FIRST()
+            return
+
+        if resident is not None:
+            self.rows, self.max_row, self.index = resident.rows, resident.max_row, resident.index
+            self.fingerprint = resident.fingerprint
+        else:
+            self.load()
+            self.index = self.get_index()
 
         self.DATE_ROW_FIRST = self.get_DATE_ROW_FIRST()
-        
-    def get_DATE_ROW_FIRST(self, debug: bool = False) -> int:
-        row = 1
+        if resident is None and not isinstance(self.rows, Snapshot):
+            self.store_snapshot()
+
+    def set_layout(self, sheet_layout):
+        """Take the sheet name, columns and header row from a layout dict, None until it is detected"""
+        self.layout = sheet_layout
+        if sheet_layout is None:
+            return
+        self.SHEET_NAME = sheet_layout["sheet"]
+        self.DATE_COLUMN = sheet_layout["date_column"]
+        self.COMMENT_COLUMN = sheet_layout["comment_column"]
+        self.HEADER_ROW = sheet_layout["header_row"]
+        self.WORK_COLUMNS = [{"start" : start, "end" : end} for start, end in sheet_layout["work_columns"]]
+
+    def _workbook(self):
+        """Open the workbook read-only, detecting (and caching) the layout if it is not known yet"""
+        with profiling.phase("import"):
+            import openpyxl as xl
+
+        workbook = xl.load_workbook(self.path, read_only=True)
+        if self.layout is None:
+            with profiling.phase("layout"):
+                self.set_layout(layout.detect(workbook))
+            layout.store(self.path, fingerprint(self.path), self.layout)
+        return workbook
+
+    @property
+    def FIRST_COLUMN(self) -> int:
+        return min([self.DATE_COLUMN, self.COMMENT_COLUMN] + [min(work_cols["start"], work_cols["end"]) for work_cols in self.WORK_COLUMNS])
+
+    @property
+    def LAST_COLUMN(self) -> int:
+        return max(max(work_cols["start"], work_cols["end"]) for work_cols in self.WORK_COLUMNS)
+
+    @property
+    def SNAPSHOT_COLUMNS(self) -> list:
+        return [self.DATE_COLUMN, self.COMMENT_COLUMN, [work_cols[key] for work_cols in self.WORK_COLUMNS for key in ("start", "end")]]
 
-        while row <= self.sheet.max_row:
-            c = self.sheet.cell(row=row, column=self.DATE_COLUMN)
+    @profiling.timed("load")
+    def load(self):
+        # Version of the file the rows belong to, taken before reading it
+        self.fingerprint = fingerprint(self.path)
 
-            if cell.is_date(c):
-                break
+        # Warm snapshot: no need to open the workbook at all
+        self.rows = Snapshot.load(self.path, *self.SNAPSHOT_COLUMNS) if self.layout is not None else None
+        if self.rows is None:
+            workbook = self._workbook()
+            try:
+                sheet = workbook[self.SHEET_NAME]
+                self.rows = list(sheet.iter_rows(max_col=self.LAST_COLUMN, values_only=True))
+            finally:
+                workbook.close()
+        self.max_row = len(self.rows)
 
-            if debug:
-                info(f"Skipping row {row} | {c.value}")
+    def _stream_workbook(self, first_row: int, last_row, columns: tuple = None):
+        """Yield (row, values) from the xlsx file without keeping the rows, columns is (first, last) (default: all)"""
+        min_column, max_column = columns or (1, self.LAST_COLUMN)
+        workbook = self._workbook()
+        try:
+            sheet = workbook[self.SHEET_NAME]
+            rows = sheet.iter_rows(min_row=first_row, max_row=last_row, min_col=min_column, max_col=max_column, values_only=True)
+            yield from enumerate(rows, start=first_row)
+        finally:
+            workbook.close()
 
-            row += 1
+    def iter_rows(self, first_row: int, last_row: int):
+        """
+        Yield (row, values) for rows first_row..last_row, values as stored in the file.
+        Without loaded rows (stream=True) they come one at a time from the snapshot or the workbook.
+        """
+        if self.rows is not None:
+            for row in range(first_row, last_row + 1):
+                yield row, self.rows[row - 1] if row <= len(self.rows) else ()
+            return
+
+        snapshot = Snapshot.load(self.path, *self.SNAPSHOT_COLUMNS)
+        if snapshot is not None:
+            for row in range(first_row, min(last_row, len(snapshot)) + 1):
+                yield row, snapshot.decode(row - 1)
+            return
+        yield from self._stream_workbook(first_row, last_row)
+
+    def block(self, first_row: int, last_row: int) -> list:
+        """
+        Values of rows first_row..last_row in one pass, one tuple per row holding
+        the columns FIRST_COLUMN..LAST_COLUMN: the value of column c of row r is
+        block[r - first_row][c - FIRST_COLUMN].
+        """
+        first, last = self.FIRST_COLUMN - 1, self.LAST_COLUMN
+        width = last - first
+        block = []
+        for _, values in self.iter_rows(first_row, last_row):
+            values = tuple(values[first:last])
+            if len(values) < width:
+                values += (None,) * (width - len(values))
+            block.append(values)
+        # Rows past the end of the sheet read as empty
+        block += [(None,) * width] * (last_row - first_row + 1 - len(block))
+        return block
+
+    def records(self, first_row: int, last_row: int) -> list:
+        """DayRecord of every row first_row..last_row read with block, None for the rows without a date"""
+        first = self.FIRST_COLUMN
+        date_column, comment_column = self.DATE_COLUMN - first, self.COMMENT_COLUMN - first
+        pairs = [(work_cols["start"] - first, work_cols["end"] - first) for work_cols in self.WORK_COLUMNS]
+        return [
+            DayRecord.from_values(values[date_column], [(values[a], values[b]) for a, b in pairs], values[comment_column])
+            if isinstance(values[date_column], date) else None
+            for values in self.block(first_row, last_row)
+        ]
+
+    def store_snapshot(self):
+        Snapshot.store(self.path, self.rows, self.DATE_ROW_FIRST, *self.SNAPSHOT_COLUMNS, fp=self.fingerprint)
+
+    def value(self, row: int, column: int):
+        # Row 0 is date_to_row's "not found", rows[-1] would be the last row
+        if row < 1 or column < 1:
+            return None
+        try:
+            return self.rows[row - 1][column - 1]
+        except IndexError:
+            return None
+
+    def unsaved_rows(self) -> set:
+        """Rows whose values here are not in the file yet (inside `clock serve`: the resident's pending edits)"""
+        resident = SheetReader.resident
+        if resident is not None and resident.path == self.path:
+            return {row for row, _ in resident.edits}
+        return set()
+
+    def column_values(self, column: int):
+        return (values[column - 1] if len(values) >= column else None for values in self.rows)
+
+    @profiling.timed("get_index")
+    def get_index(self) -> DateIndex:
+        # Reuse the stored index if the workbook did not change, else build it in one pass
+        index = DateIndex.load(self.path, self.DATE_COLUMN)
+        if index is None:
+            index = DateIndex.build(self.column_values(self.DATE_COLUMN))
+            index.store(self.path, self.DATE_COLUMN, self.fingerprint)
+        return index
+
+    @profiling.timed("get_DATE_ROW_FIRST")
+    def get_DATE_ROW_FIRST(self, debug: bool = False) -> int:
+        row = self.index.first_row
 
         if debug:
-            info(f"Date row found at {row} | {c.value}")
+            info(f"Date row found at {row} | {self.value(row, self.DATE_COLUMN)}")
 
         return row
     
-    def get_work_hours(self, row, verbose = False):
-        total_time = timedelta(0)
-        work_list = []
-        empty_block_encountered = False
-
-        date_target = self.sheet.cell(row=row, column=self.DATE_COLUMN).value
-        for i, work_cols in enumerate(self.WORK_COLUMNS):
-            work_start = self.sheet.cell(row=row, column=work_cols["start"]).value
-            work_end = self.sheet.cell(row=row, column=work_cols["end"]).value
-
-            # Normalize None and datetime
-            # If values are strings or numbers, you might need parsing here
-            # Assuming they are datetime.time or datetime.datetime or None
-            
-            if work_start is None and work_end is None:
-                # Mark we have an empty pair
-                empty_block_encountered = True
-                continue
-
-            # If empty_block_encountered before, but now we found filled pair → error (gap)
-            if empty_block_encountered:
-                if verbose:
-                    error(f"({date_target.strftime('%d/%m/%Y')}) Gap detected: work period {i+1} has entries after empty pair")
-                continue
-
-            # Only end filled → error
-            if work_start is None and work_end is not None:
-                if verbose:
-                    error(f"({date_target.strftime('%d/%m/%Y')}) Work start must be filled if work end is filled (pair {i+1})")
-                continue
-
-            # If only start filled (no end), consider incomplete — could raise or ignore
-            if work_start is not None and work_end is None:
-                if verbose:
-                    warn(f"({date_target.strftime('%d/%m/%Y')}) Work end missing for work start (pair {i+1})")
-                work_list.append({"start" : work_start, "end" : None})
-                continue
-
-            if datetime.combine(date.today(), work_end) < datetime.combine(date.today(), work_start):
-                if verbose:
-                    error(f"({date_target.strftime('%d/%m/%Y')}) Work end time is before start time (pair {i+1})")
-                continue
-
-            total_time += (datetime.combine(date.today(), work_end) - datetime.combine(date.today(), work_start))
-            work_list.append({"start" : work_start, "end" : work_end})
-
-        return total_time, work_list
-
-    def date_to_row(self, target_date: date) -> int:
-        row = self.DATE_ROW_FIRST
-
-        while row <= self.sheet.max_row:
-            c = self.sheet.cell(row=row, column=self.DATE_COLUMN)
+    @profiling.timed("get_work_hours")
+    def get_work_hours(self, row, verbose = False) -> DayRecord:
+        return self.work_hours(lambda column: self.value(row, column), verbose)
 
-            if isinstance(c.value, datetime):
-                cell_date = c.value.date()
-            else:
-                cell_date = c.value
+    def row_work_hours(self, values: tuple, verbose = False, first_column: int = 1) -> DayRecord:
+        """get_work_hours of a row given as its tuple of values starting at first_column, e.g. from iter_rows or block"""
+        return self.work_hours(lambda column: values[column - first_column] if 0 <= column - first_column < len(values) else None, verbose)
 
-            if cell_date == target_date:
-                return row
+    def work_hours(self, value, verbose = False) -> DayRecord:
+        """
+        Parameters:
+        value - function giving the value of a column of the row
+        verbose - print what is wrong with the work pairs
+        """
+        pairs = [(value(work_cols["start"]), value(work_cols["end"])) for work_cols in self.WORK_COLUMNS]
+        record = DayRecord.from_values(value(self.DATE_COLUMN), pairs, value(self.COMMENT_COLUMN))
+        if verbose and record.problems:
+            diagnostics = Diagnostics()
+            for pair, flag in record.problems:
+                diagnostics.add(record.date, None, pair, FLAG_KINDS[flag])
+            diagnostics.render()
+        return record
 
-            row += 1
+    @profiling.timed("date_to_row")
+    def date_to_row(self, target_date: date) -> int:
+        row = self.index.lookup(target_date)
+        if row:
+            return row
 
         error(f"Date {target_date} not found in column {self.DATE_COLUMN}")
         return 0
     
+    @profiling.timed("render")
     def print_row(self, row: int):
+        if not row:
+            return
+        with profiling.phase("import"):
+            from tabulate import tabulate
+
         headers = ["Date", "Comments"]
 
-        date_str  = self.sheet.cell(row=row, column=self.DATE_COLUMN).value.strftime("%d/%m/%Y")  # 15/01/2026
-        comment_str = self.sheet.cell(row=row, column=self.COMMENT_COLUMN).value
+        record = self.get_work_hours(row, verbose=True)
+        date_str  = record.date.strftime("%d/%m/%Y")  # 15/01/2026
+        comment_str = record.comment
         
         row_content = [[date_str, comment_str]]    
         
         # add work hours
-        total_time, work_list = self.get_work_hours(row, verbose=True)
-        if work_list:
+        if record:
             headers += ["Total time"]
-            row_content[0] += [format_timedelta(total_time)]
-            for i, work_dict in enumerate(work_list):
+            row_content[0] += [format_minutes(record.total)]
+            for i, (start, end) in enumerate(record.intervals):
                 headers += [f"Start {i+1}", f"End {i+1}"]
-                row_content[0] += [work_dict["start"].strftime("%H:%M"), work_dict["end"].strftime("%H:%M") if work_dict["end"] else ""]
+                row_content[0] += [format_minutes(start), format_minutes(end)]
         
         print(tabulate(row_content,headers=headers, tablefmt="grid"))
-        
+
+    @profiling.timed("render")
+    def print_range(self, first: date, last: date):
+        """
+        Print the days from first to last as one table with the total of each day and of the period.
+        The columns are read in one block and the table is written row by row as it goes.
+        """
+        rows = self.index.rows_between(first, last)
+        if not rows:
+            error(f"No dates between {first} and {last} in the sheet")
+            return
+
+        dates, comments, starts, ends = load_rows(self, rows)
+        totals = day_totals(starts, ends)
+
+        headers = ["Date", "Comments", "Total"] + [f"{key} {i + 1}" for i in range(len(self.WORK_COLUMNS)) for key in ("Start", "End")]
+        period = format_minutes(sum(totals))
+        widths = [14, max([8] + [len(c) for c in comments if c]), max(5, len(period))] + [7] * (2 * len(self.WORK_COLUMNS))
+
+        def line(cells):
+            return "|" + "|".join(f" {cell:<{width}} " for cell, width in zip(cells, widths)) + "|"
+
+        # Same look as the grid table of print_row
+        rule = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+        print(rule)
+        print(line(headers))
+        print(rule.replace("-", "="))
+
+        for i, date_target in enumerate(dates):
+            pairs = [format_minutes(times[i]) for start, end in zip(starts, ends) for times in (start, end)]
+            total = format_minutes(totals[i]) if totals[i] else ""
+            print(line([date_target.strftime("%a %d/%m/%Y"), comments[i] or "", total] + pairs), flush=True)
+
+        print(rule)
+        worked = sum(1 for total in totals if total)
+        print(line(["Total", f"{worked} days", period] + [""] * (2 * len(self.WORK_COLUMNS))))
+        print(rule)
+
+
+class Sheet(SheetReader):
+    """
+    Time sheet opened for writing.
+
+    Edits are collected with set_value and written by save directly into the
+    sheet part of the xlsx file, the rest of the archive is copied untouched.
+    If a cell cannot be patched in place, the workbook is saved through openpyxl.
+    Concurrent saves are serialized and merged, see utils/lock.py.
+    Open it with Sheet.editing when the edits depend on what is in the sheet.
+    """
+    def __init__(self, path=None):
+        self.edits = {}
+        self.number_formats = {}
+        # Journal records applied by journal.replay
+        self.replayed = 0
+        super().__init__(path)
+
+    @classmethod
+    @contextlib.contextmanager
+    def editing(cls, path=None):
+        """Yield the sheet read with the workbook lock held until the end of the block, so no other writer comes in between"""
+        with lock.locked(Path(path) if path else EXCEL_FILE):
+            yield cls(path)
+
+    def value(self, row: int, column: int):
+        if (row, column) in self.edits:
+            return self.edits[(row, column)]
+        return super().value(row, column)
+
+    def block(self, first_row: int, last_row: int) -> list:
+        block = super().block(first_row, last_row)
+        first = self.FIRST_COLUMN
+        for (row, column), value in self.edits.items():
+            if first_row <= row <= last_row and first <= column <= self.LAST_COLUMN:
+                values = list(block[row - first_row])
+                values[column - first] = value
+                block[row - first_row] = tuple(values)
+        return block
+
+    def unsaved_rows(self) -> set:
+        return super().unsaved_rows() | {row for row, _ in self.edits}
+
+    def set_value(self, row: int, column: int, value, number_format: str = None):
+        self.edits[(row, column)] = value
+        if number_format:
+            self.number_formats[(row, column)] = number_format
+
+    @profiling.timed("save")
     def save(self):
-        self.workbook.save(EXCEL_FILE)
-        
\ No newline at end of file
+        resident = SheetReader.resident
+        if resident is not None and resident is not self and resident.path == self.path:
+            # Inside `clock serve`: hand the edits over, the daemon writes the file later
+            resident.merge(self.edits, self.number_formats)
+            self.edits.clear()
+            self.number_formats.clear()
+            # Folding the edits gave the resident new rows, keep looking at the same ones
+            self.rows, self.max_row = resident.rows, resident.max_row
+            status.saved(self)
+            return
+
+        entry = lock.spool(self.path, self.edits, self.number_formats)
+        with lock.locked(self.path):
+            entries = lock.drain(self.path)
+            if entry not in [queued for queued, _, _ in entries]:
+                # Another writer saved our edits together with its own, the file moved on without us
+                self.fold_edits()
+                self.edits.clear()
+                self.number_formats.clear()
+                return
+
+            unchanged = fingerprint(self.path) == self.fingerprint
+            for _, edits, number_formats in entries:
+                self.edits.update(edits)
+                self.number_formats.update(number_formats)
+
+            try:
+                try:
+                    patch_cells(self.path, self.SHEET_NAME, self.edits, self.number_formats)
+                except PatchError:
+                    self.save_workbook()
+            except BaseException:
+                # Nothing was written: the other writers retry their own entries, ours must not outlive us
+                entry.unlink()
+                raise
+            for queued, _, _ in entries:
+                queued.unlink()
+
+            # The file now matches the edits
+            edited_rows = {row for row, _ in self.edits}
+            self.fold_edits()
+            self.edits.clear()
+            self.number_formats.clear()
+
+            # Only if nobody wrote since we read, else our rows are not what is in the file
+            if unchanged:
+                previous, self.fingerprint = self.fingerprint, fingerprint(self.path)
+                # The dates did not move, only the fingerprint changed
+                self.index.store(self.path, self.DATE_COLUMN, self.fingerprint)
+                if not layout.pinned():
+                    layout.store(self.path, self.fingerprint, self.layout)
+                self.store_snapshot()
+                Totals.saved(self, previous, edited_rows)
+                status.saved(self)
+
+    def fold_edits(self):
+        """Apply the edits to the values read from the file"""
+        self.rows = list(self.rows)
+        for (row, column), value in self.edits.items():
+            self.rows += [()] * (row - len(self.rows))
+            values = list(self.rows[row - 1])
+            values += [None] * (column - len(values))
+            values[column - 1] = value
+            self.rows[row - 1] = tuple(values)
+        self.max_row = len(self.rows)
+
+    def save_workbook(self):
+        import openpyxl as xl
+
+        workbook = xl.load_workbook(self.path)
+        sheet = workbook[self.SHEET_NAME]
+        for (row, column), value in self.edits.items():
+            sheet.cell(row=row, column=column).value = value
+        for (row, column), number_format in self.number_formats.items():
+            sheet.cell(row=row, column=column).number_format = number_format
+
+        # Write next to the file and swap, a crash never leaves half a workbook
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".xlsx")
+        os.close(fd)
+        try:
+            workbook.save(tmp)
+            shutil.copymode(self.path, tmp)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,175 @@
+"""
+Binary snapshot of the time recording grid
+
+Keeps the date, comment and work columns of every row in a sidecar file so
+that readers do not need openpyxl at all while the workbook is unchanged.
+
+Layout of the file:
+    MAGIC | uint32 length of the json header | json header | dates | times
+where dates are int32 ordinals (0 for an empty cell) and times are int64
+microseconds since midnight (-1 for an empty cell), one entry per work
+column per row. The file is memory-mapped and rows are decoded on access.
+"""
+import json
+import mmap
+import struct
+from array import array
+from datetime import datetime, time
+from itertools import islice
+
+from .file import cache_file, fingerprint
+
+MAGIC = b"CLKSNAP1"
+_LENGTH = struct.Struct("<I")
+
+
+def _time_to_us(value) -> int:
+    if value is None:
+        return -1
+    if isinstance(value, time) and not isinstance(value, datetime) and value.tzinfo is None:
+        return ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+    raise ValueError(f"Cannot store {value!r} as a time")
+
+
+def _us_to_time(us: int):
+    if us < 0:
+        return None
+    seconds, microsecond = divmod(us, 1_000_000)
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60, microsecond)
+
+
+def _date_to_ordinal(value) -> int:
+    if value is None:
+        return 0
+    # openpyxl gives dates back as datetimes at midnight
+    if isinstance(value, datetime) and value.time() == time(0):
+        return value.toordinal()
+    raise ValueError(f"Cannot store {value!r} as a date")
+
+
+class Snapshot:
+    """
+    Sequence of row tuples, like the values_only rows of openpyxl, backed by the mapped file.
+    Only the date, comment and work columns are filled, everything else reads as None.
+    """
+    def __init__(self, buffer, header, offset):
+        self.buffer = buffer
+        self.first_row = header["first_row"]
+        self.nrows = header["nrows"]
+        self.width = header["width"]
+        self.date_column = header["date_column"]
+        self.comment_column = header["comment_column"]
+        self.work_columns = header["work_columns"]
+        self.comments = {int(k): v for k, v in header["comments"].items()}
+
+        view = memoryview(buffer)
+        dates_size = 4 * self.nrows
+        self.dates = view[offset:offset + dates_size].cast("i")
+        self.times = view[offset + dates_size:offset + dates_size + 8 * self.nrows * len(self.work_columns)].cast("q")
+        self._rows = {}
+
+    def __len__(self):
+        return self.first_row - 1 + self.nrows
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+
+        values = self._rows.get(i)
+        if values is None:
+            values = self._rows[i] = self.decode(i)
+        return values
+
+    def decode(self, i: int) -> tuple:
+        """Row i (0-based) straight from the file, without keeping it around"""
+        values = [None] * self.width
+        offset = i - (self.first_row - 1)
+        if offset >= 0:
+            ordinal = self.dates[offset]
+            if ordinal:
+                values[self.date_column - 1] = datetime.fromordinal(ordinal)
+            values[self.comment_column - 1] = self.comments.get(offset)
+            n = len(self.work_columns)
+            for j, column in enumerate(self.work_columns):
+                values[column - 1] = _us_to_time(self.times[offset * n + j])
+        return tuple(values)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @classmethod
+    def load(cls, path, date_column, comment_column, work_columns):
+        """Return the snapshot of the workbook at path, None if missing, stale or for another layout"""
+        try:
+            with open(cache_file(path, "snapshot.bin"), "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if buffer[:len(MAGIC)] != MAGIC:
+                return None
+            (length,) = _LENGTH.unpack_from(buffer, len(MAGIC))
+            offset = len(MAGIC) + _LENGTH.size
+            header = json.loads(buffer[offset:offset + length])
+            layout = [date_column, comment_column, work_columns]
+            if header["fingerprint"] != fingerprint(path) or header["layout"] != layout:
+                return None
+            return cls(buffer, header, offset + length)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    @staticmethod
+    def store(path, rows, first_row, date_column, comment_column, work_columns, fp=None):
+        """
+        Store the snapshot of rows for the version fp (default: the current one) of the workbook at path.
+        Nothing is stored if some value does not fit the format (e.g. text in a time cell).
+        """
+        width = max(*work_columns, date_column, comment_column)
+        dates = array("i")
+        times = array("q")
+        comments = {}
+        rows = [tuple(values) + (None,) * (width - len(values)) for values in islice(rows, first_row - 1, None)]
+        # Footer rows after the calendar (totals, signatures, ...) are not part of the snapshot
+        while rows and not isinstance(rows[-1][date_column - 1], datetime):
+            rows.pop()
+
+        try:
+            for offset, values in enumerate(rows):
+                dates.append(_date_to_ordinal(values[date_column - 1]))
+                comment = values[comment_column - 1]
+                if comment is not None:
+                    if not isinstance(comment, str):
+                        raise ValueError(f"Cannot store {comment!r} as a comment")
+                    comments[offset] = comment
+                times.extend(_time_to_us(values[column - 1]) for column in work_columns)
+        except ValueError:
+            return
+
+        header = json.dumps({
+            "fingerprint": fp or fingerprint(path),
+            "layout": [date_column, comment_column, work_columns],
+            "first_row": first_row,
+            "nrows": len(dates),
+            "width": width,
+            "date_column": date_column,
+            "comment_column": comment_column,
+            "work_columns": work_columns,
+            "comments": comments,
+        }).encode()
+
+        target = cache_file(path, "snapshot.bin")
+        tmp = target.with_suffix(".tmp")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(MAGIC)
+                f.write(_LENGTH.pack(len(header)))
+                f.write(header)
+                dates.tofile(f)
+                times.tofile(f)
+            tmp.replace(target)
+        except OSError:
+            pass
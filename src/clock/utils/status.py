@@ -0,0 +1,173 @@
+"""
+Today's work times in a tiny file, for shell prompts
+
+Every save of this year's workbook (and every journaled clock in/out/clear)
+writes today's intervals to a small text file, so `clock status` only reads
+that file and stats the two it names: no openpyxl, rich or tabulate, and not
+even json or pathlib. The file is stale when it is from another day or when
+the workbook or the journal changed since it was written (e.g. an edit in
+Excel); then the workbook is read once and the file written again.
+
+The file has one tab separated field per line:
+    date       2026-01-15
+    workbook   <path>  <mtime_ns> <size>
+    journal    <path>  <mtime_ns> <size>   ("-" if there is no journal)
+    pairs      4
+    intervals  540-750 780-        (minutes since midnight, no end while clocked in)
+
+This module is imported on every prompt, keep its imports light.
+"""
+import os
+from datetime import date, datetime
+
+from .day import EMPTY, DayRecord, format_minutes
+from .time import time_to_minutes
+
+# file.CACHE_DIR / "status", spelled out to avoid importing pathlib
+STATUS_FILE = os.path.join(os.path.expanduser("~"), ".cache", "desyclock", "status")
+
+
+def _stat(path) -> str:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "-"
+    return f"{stat.st_mtime_ns} {stat.st_size}"
+
+
+def _format_intervals(intervals) -> str:
+    return " ".join(f"{start}-{end if end >= 0 else ''}" for start, end in intervals)
+
+
+def _parse_intervals(text: str) -> list:
+    intervals = []
+    for interval in text.split():
+        start, _, end = interval.partition("-")
+        intervals.append((int(start), int(end) if end else EMPTY))
+    return intervals
+
+
+def write(intervals: list, pairs: int) -> dict:
+    """Store today's intervals, (start, end) in minutes with end EMPTY while clocked in"""
+    from .file import EXCEL_FILE
+    from .journal import JOURNAL
+
+    data = {
+        "date": date.today().isoformat(),
+        "workbook": [str(EXCEL_FILE), _stat(EXCEL_FILE)],
+        "journal": [str(JOURNAL), _stat(JOURNAL)],
+        "pairs": pairs,
+        "intervals": list(intervals),
+    }
+    text = (
+        f"date\t{data['date']}\n"
+        f"workbook\t{data['workbook'][0]}\t{data['workbook'][1]}\n"
+        f"journal\t{data['journal'][0]}\t{data['journal'][1]}\n"
+        f"pairs\t{pairs}\n"
+        f"intervals\t{_format_intervals(data['intervals'])}\n"
+    )
+    tmp = f"{STATUS_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(STATUS_FILE), exist_ok=True)
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, STATUS_FILE)
+    except OSError:
+        pass
+    return data
+
+
+def read():
+    """The stored status as a dict (see write), None if it is missing or stale"""
+    try:
+        with open(STATUS_FILE) as f:
+            fields = dict(line.rstrip("\n").split("\t", 1) for line in f if "\t" in line)
+        data = {
+            "date": fields["date"],
+            "workbook": fields["workbook"].split("\t"),
+            "journal": fields["journal"].split("\t"),
+            "pairs": int(fields["pairs"]),
+            "intervals": _parse_intervals(fields["intervals"]),
+        }
+    except (OSError, KeyError, ValueError):
+        return None
+    if data["date"] != date.today().isoformat():
+        return None
+    # A new year has a new workbook, but then the date is off too
+    for path, stat in (data["workbook"], data["journal"]):
+        if _stat(path) != stat:
+            return None
+    return data
+
+
+def saved(s):
+    """Called by Sheet.save once s holds what is in this year's file"""
+    from .file import EXCEL_FILE
+    from .journal import pending
+
+    if s.path != EXCEL_FILE:
+        return
+    row = s.index.lookup(date.today())
+    # Journaled records that are not in s, the next clock status replays them
+    if not row or len(pending()) > s.replayed:
+        return
+    write(s.get_work_hours(row).intervals, len(s.WORK_COLUMNS))
+
+
+def journaled(data, op: str, date_target: date, time_target=None):
+    """
+    Called after appending a record to the journal, data is the status read before:
+    apply the record with the rules of the commands instead of reading the workbook.
+    """
+    from .rules import RuleError, clock_in_slot, clock_out_slot
+
+    if data is None:
+        return
+    intervals = data["intervals"]
+    if date_target == date.today():
+        record = DayRecord(date_target, intervals)
+        try:
+            if op == "clear":
+                intervals = []
+            elif op == "in":
+                clock_in_slot(record, time_target, data["pairs"])
+                intervals.append((time_to_minutes(time_target), EMPTY))
+            else:
+                slot = clock_out_slot(record, time_target)
+                intervals[slot] = (intervals[slot][0], time_to_minutes(time_target))
+        except RuleError:
+            # The sync will reject it too, the status stays as it was
+            pass
+    write(intervals, data["pairs"])
+
+
+def refresh():
+    """Read today's intervals from the workbook (journal included) and store them, None without a row for today"""
+    from . import journal
+    from .sheet import Sheet, SheetReader
+
+    records = journal.pending()
+    s = Sheet() if records else SheetReader()
+    journal.replay(s, records)
+    row = s.index.lookup(date.today())
+    if not row:
+        return None
+    return write(s.get_work_hours(row).intervals, len(s.WORK_COLUMNS))
+
+
+def _hours(minutes: int) -> str:
+    return f"{minutes // 60}h{minutes % 60:02d}"
+
+
+def describe(data: dict, now: datetime = None) -> str:
+    """e.g. "clocked in since 09:12, 3h41 today", the open interval counts until now"""
+    now = now or datetime.now()
+    intervals = data["intervals"]
+    worked = sum(end - start for start, end in intervals if end >= 0)
+    if not intervals:
+        return "not clocked in today"
+    start, end = intervals[-1]
+    if end < 0:
+        worked += max(time_to_minutes(now) - start, 0)
+        return f"clocked in since {format_minutes(start)}, {_hours(worked)} today"
+    return f"clocked out at {format_minutes(end)}, {_hours(worked)} today"
@@ -0,0 +1,85 @@
+"""
+Check and total many time sheets at once, e.g. the whole group before payroll
+
+Every workbook is read, checked and totalled in its own worker process
+(summarize has to stay a module level function to be sent to the pool),
+only the small summaries come back and are merged by the caller.
+"""
+import glob
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+_TEMPLATE_NAME = re.compile(r"Zeiterfassungstabelle\s*\d{4}\s*Doktorand_innen", re.IGNORECASE)
+
+
+def workbooks(sources: list) -> list:
+    """The xlsx files of the sources, each a file, a directory (searched recursively) or a glob"""
+    found = []
+    for source in sources:
+        path = Path(source).expanduser()
+        if path.is_dir():
+            found += path.rglob("*.xlsx")
+        elif path.is_file():
+            found.append(path)
+        else:
+            found += map(Path, glob.glob(str(path), recursive=True))
+    # Excel keeps "~$name.xlsx" lock files next to open workbooks
+    return sorted({path.resolve() for path in found if not path.name.startswith("~$")})
+
+
+def person(path: Path) -> str:
+    """Who a workbook belongs to: its name without the template part, else the folder it is in"""
+    name = _TEMPLATE_NAME.sub("", path.stem).strip(" -_")
+    return name or path.parent.name
+
+
+def summarize(path: Path, first, last) -> dict:
+    """
+    Check and total the days from first to last of the workbook at path.
+
+    Returns:
+        dict with person, path, days, workdays, worked (minutes), errors and warnings,
+        or with an error message if the workbook cannot be read
+    """
+    from .checker import check_columns, day_totals, load_rows
+    from .diagnostics import ERROR, SEVERITY, WARNING
+    from .sheet import SheetReader
+    from .time import is_holiday, is_weekend
+
+    summary = {"person": person(path), "path": str(path)}
+    try:
+        s = SheetReader(path)
+        rows = s.index.rows_between(first, last)
+        dates, comments, starts, ends = load_rows(s, rows)
+    except Exception as e:
+        # One broken file must not stop the report of everybody else
+        summary["error"] = f"{type(e).__name__}: {e}"
+        return summary
+
+    severities = [SEVERITY[kind] for _, _, kind in check_columns(dates, comments, starts, ends)]
+    summary.update(
+        days=len(dates),
+        workdays=sum(1 for d, comment in zip(dates, comments) if not (is_weekend(d) or is_holiday(comment))),
+        worked=sum(day_totals(starts, ends)),
+        errors=severities.count(ERROR),
+        warnings=severities.count(WARNING),
+    )
+    return summary
+
+
+def _cores() -> int:
+    # The cores we may run on, which can be fewer than the machine has
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def summarize_all(paths: list, first, last, workers: int = None) -> list:
+    """summarize every workbook, in parallel over workers processes (default: one per core)"""
+    workers = min(workers or _cores(), len(paths))
+    if workers <= 1:
+        return [summarize(path, first, last) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(summarize, paths, [first] * len(paths), [last] * len(paths)))
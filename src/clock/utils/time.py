@@ -1,4 +1,4 @@
-from datetime import date, time
+from datetime import date, datetime, time
 
 MONTHS = [
     "January",
@@ -29,6 +29,11 @@ def format_timedelta(td):
     minutes = (total_seconds % 3600) // 60
     return f"{hours:02d}:{minutes:02d}"
 
+def format_signed_timedelta(td):
+    """Like format_timedelta with a sign, e.g. for balances"""
+    sign = "-" if td.total_seconds() < 0 else "+"
+    return sign + format_timedelta(abs(td))
+
 def is_weekend(date_target):
     """Return True if it is a weekend"""
     return date_target.weekday() >= 5
@@ -42,4 +47,16 @@ def time_to_minutes(t: time) -> int:
 
 def minutes_to_time(m: int) -> time:
     m = max(0, min(23 * 60 + 59, int(m)))
-    return time(m // 60, m % 60)
\ No newline at end of file
+    return time(m // 60, m % 60)
+
+def parse_date(text: str, year: int = None) -> date:
+    """DD/MM (in year), DD/MM/YYYY or YYYY-MM-DD"""
+    for fmt in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(f"{text}/{year or date.today().year}", "%d/%m/%Y").date()
+    except ValueError:
+        raise ValueError(f"Invalid date '{text}', use DD/MM, DD/MM/YYYY or YYYY-MM-DD")
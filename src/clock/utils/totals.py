@@ -0,0 +1,142 @@
+"""
+Cached daily totals and prefix sums for reports
+
+For every date row we keep the worked time, whether it is a working day
+(not a weekend, not a holiday) and a key of the cells it was computed from,
+plus the prefix sums of both. A sum over any range of days is then two
+lookups. Rows are recomputed only when they change: Sheet.save passes the
+rows it wrote, and after an outside edit (Excel) the keys tell which rows
+differ. Like the other caches it lives in $HOME/.cache/desyclock.
+"""
+import json
+from datetime import date
+from itertools import accumulate
+
+from .checker import day_totals, load_rows, row_keys
+from .file import cache_file
+from .time import is_holiday, is_weekend
+
+# Of the worked times, caches from before they were in minutes are rebuilt
+UNIT = "minutes"
+
+
+class Totals:
+    """
+    Per-day totals of a sheet, positions follow the date rows in date order.
+    prefix_worked[i] and prefix_workdays[i] are the sums over positions < i.
+    """
+    def __init__(self, rows: list, keys: list, worked: list, workdays: list):
+        self.rows = rows
+        self.keys = keys
+        self.worked = worked
+        self.workdays = workdays
+        self.position = {row: i for i, row in enumerate(rows)}
+        self.prefix_worked = [0] + list(accumulate(worked))
+        self.prefix_workdays = [0] + list(accumulate(workdays))
+
+    def recompute(self, s, positions):
+        """Recompute the given positions from the sheet and fix the prefix sums after them"""
+        positions = sorted(set(positions))
+        if not positions:
+            return
+        rows = [self.rows[i] for i in positions]
+        dates, comments, starts, ends = load_rows(s, rows)
+        for i, key, date_target, comment, worked in zip(positions, row_keys(s, rows), dates, comments, day_totals(starts, ends)):
+            self.keys[i] = key
+            self.worked[i] = worked
+            self.workdays[i] = int(not (is_weekend(date_target) or is_holiday(comment)))
+
+        first = positions[0]
+        for i in range(first, len(self.rows)):
+            self.prefix_worked[i + 1] = self.prefix_worked[i] + self.worked[i]
+            self.prefix_workdays[i + 1] = self.prefix_workdays[i] + self.workdays[i]
+
+    def between(self, first_row: int, last_row: int):
+        """
+        Returns:
+            worked minutes and number of working days from first_row to last_row, inclusive
+        """
+        i, j = self.position[first_row], self.position[last_row] + 1
+        return self.prefix_worked[j] - self.prefix_worked[i], self.prefix_workdays[j] - self.prefix_workdays[i]
+
+    @staticmethod
+    def _read(path) -> dict:
+        try:
+            with open(cache_file(path, "totals.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def store(self, s):
+        data = {
+            "fingerprint": s.fingerprint,
+            "layout": s.SNAPSHOT_COLUMNS,
+            "unit": UNIT,
+            "rows": self.rows,
+            "keys": self.keys,
+            "worked": self.worked,
+            "workdays": self.workdays,
+            "prefix_worked": self.prefix_worked,
+            "prefix_workdays": self.prefix_workdays,
+        }
+        target = cache_file(s.path, "totals.json")
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, "w") as f:
+                json.dump(data, f)
+        except OSError:
+            pass
+
+    @classmethod
+    def _cached(cls, s, data: dict, rows: list):
+        """The cached totals if they are for the same rows and layout, else None"""
+        if data.get("layout") != s.SNAPSHOT_COLUMNS or data.get("unit") != UNIT or data.get("rows") != rows:
+            return None
+        totals = cls.__new__(cls)
+        totals.rows = rows
+        totals.keys = data["keys"]
+        totals.worked = data["worked"]
+        totals.workdays = data["workdays"]
+        totals.prefix_worked = data["prefix_worked"]
+        totals.prefix_workdays = data["prefix_workdays"]
+        totals.position = {row: i for i, row in enumerate(rows)}
+        return totals
+
+    @classmethod
+    def load(cls, s):
+        """Return the totals of a SheetReader (or Sheet, pending edits included), updating the cache"""
+        rows = list(s.index.rows_between(date.min, date.max))
+        data = cls._read(s.path)
+        totals = cls._cached(s, data, rows)
+        edited = s.unsaved_rows()
+
+        stale = totals is None or data["fingerprint"] != s.fingerprint
+        if totals is None:
+            n = len(rows)
+            totals = cls(rows, [0] * n, [0] * n, [0] * n)
+            changed = range(n)
+        elif not stale:
+            changed = [totals.position[row] for row in edited if row in totals.position]
+        else:
+            # The file changed behind our back, find the rows that did
+            changed = [i for i, key in enumerate(row_keys(s, rows)) if totals.keys[i] != key]
+
+        totals.recompute(s, changed)
+        # Unsaved edits must not end up in the cache of the file
+        if stale and not edited:
+            totals.store(s)
+        return totals
+
+    @classmethod
+    def saved(cls, s, previous_fingerprint, rows):
+        """Called by Sheet.save: only the written rows changed since previous_fingerprint"""
+        data = cls._read(s.path)
+        if data.get("fingerprint") != previous_fingerprint:
+            # No cache for the version we started from, the next load rebuilds what is needed
+            return
+        totals = cls._cached(s, data, data.get("rows"))
+        if totals is None:
+            return
+        totals.recompute(s, [totals.position[row] for row in rows if row in totals.position])
+        totals.store(s)
+
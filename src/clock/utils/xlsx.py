@@ -0,0 +1,174 @@
+"""
+In-place editing of single cells of an xlsx file
+
+An xlsx file is a zip archive of xml parts. To change a handful of cells we
+only rewrite the <c> elements of those cells inside the worksheet part,
+every other member of the archive (styles, drawings, other sheets, ...) is
+copied through untouched. Whatever cannot be done safely this way raises
+PatchError, and the caller is expected to fall back to openpyxl.
+"""
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, time
+from xml.etree import ElementTree
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Builtin number formats showing a time of day
+BUILTIN_TIME_FORMATS = {
+    18: "h:mm AM/PM", 19: "h:mm:ss AM/PM", 20: "h:mm", 21: "h:mm:ss",
+    22: "m/d/yy h:mm", 45: "mm:ss", 46: "[h]:mm:ss", 47: "mmss.0",
+}
+
+# Text never contains a raw "<", so [^<]* cannot run past the element (.*? backtracks over the whole sheet)
+_FORMULA_VALUE = re.compile(r"(<f\b[^>]*(?:/>|>[^<]*</f>))<v>[^<]*</v>")
+
+
+class PatchError(Exception):
+    """The edits cannot be applied in place"""
+
+
+def column_letter(column: int) -> str:
+    """1 -> A, 27 -> AA, same as openpyxl.utils.get_column_letter without importing openpyxl"""
+    letters = ""
+    while column > 0:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def sheet_part(archive: zipfile.ZipFile, sheet_name: str) -> str:
+    """Return the name of the archive member holding sheet_name"""
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+
+    for sheet in workbook.iter(f"{NS_MAIN}sheet"):
+        if sheet.get("name") != sheet_name:
+            continue
+        rel_id = sheet.get(f"{NS_REL}id")
+        for rel in rels.iter(f"{NS_PKG_REL}Relationship"):
+            if rel.get("Id") == rel_id:
+                target = rel.get("Target")
+                if target.startswith("/"):
+                    return target.lstrip("/")
+                return posixpath.normpath(posixpath.join("xl", target))
+
+    raise PatchError(f"Sheet {sheet_name} not found")
+
+
+def time_styles(archive: zipfile.ZipFile) -> dict:
+    """Return {index: format code} of the cell styles that display a time"""
+    try:
+        styles = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    except KeyError:
+        return {}
+
+    time_formats = dict(BUILTIN_TIME_FORMATS)
+    for num_fmt in styles.iter(f"{NS_MAIN}numFmt"):
+        # Strip literals and colors before looking for an hour placeholder
+        code = re.sub(r'"[^"]*"|\[[^\]]*\]', "", num_fmt.get("formatCode", ""))
+        if "h" in code.lower():
+            time_formats[int(num_fmt.get("numFmtId"))] = num_fmt.get("formatCode")
+
+    cell_xfs = styles.find(f"{NS_MAIN}cellXfs")
+    if cell_xfs is None:
+        return {}
+    return {
+        i: time_formats[int(xf.get("numFmtId", 0))]
+        for i, xf in enumerate(cell_xfs) if int(xf.get("numFmtId", 0)) in time_formats
+    }
+
+
+def recalc_on_load(xml: str) -> str:
+    """Return workbook.xml asking the spreadsheet to recompute every formula when the file is opened"""
+    match = re.search(r"<calcPr\b[^>]*?(?=/?>)", xml)
+    if match is None:
+        # Where a new <calcPr> may go depends on what else the workbook holds
+        raise PatchError("Workbook has no calculation properties")
+    tag = match.group(0)
+    if re.search(r'\bfullCalcOnLoad="(1|true)"', tag):
+        return xml
+    tag = re.sub(r'\sfullCalcOnLoad="[^"]*"', "", tag) + ' fullCalcOnLoad="1"'
+    return xml[:match.start()] + tag + xml[match.end():]
+
+
+def serialize(value):
+    """Return the content of <v> for value, None for an empty cell"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, time) and not isinstance(value, datetime):
+        seconds = value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+        return repr(seconds / 86400)
+    raise PatchError(f"Cannot write {type(value).__name__} values in place")
+
+
+def patch_cell(xml: str, ref: str, value, styles: dict, number_format: str = None) -> str:
+    match = re.search(rf'<c\b[^>]*\br="{ref}"[^>]*?(?:/>|>.*?</c>)', xml, re.DOTALL)
+    if match is None:
+        if value is None:
+            return xml
+        # A new cell would need a new style for its number format
+        raise PatchError(f"Cell {ref} does not exist")
+
+    tag = re.match(r"<c\b[^>]*?(?=/?>)", match.group(0)).group(0)
+    style = re.search(r'\bs="(\d+)"', tag)
+    if isinstance(value, time) and (style is None or int(style.group(1)) not in styles):
+        raise PatchError(f"Cell {ref} is not formatted as a time")
+    # Changing the format would need a new style
+    if number_format and value is not None:
+        if style is None or styles.get(int(style.group(1)), "").lower() != number_format.lower():
+            raise PatchError(f"Cell {ref} is not formatted as {number_format}")
+
+    # The type goes, numbers are the default
+    tag = re.sub(r'\st="[^"]*"', "", tag)
+    content = serialize(value)
+    new = f"{tag}/>" if content is None else f"{tag}><v>{content}</v></c>"
+
+    return xml[:match.start()] + new + xml[match.end():]
+
+
+def patch_cells(path, sheet_name: str, edits: dict, number_formats: dict = None):
+    """
+    Write edits to the xlsx file at path without going through openpyxl.
+
+    Parameters:
+    path - xlsx file
+    sheet_name - name of the sheet the edits belong to
+    edits - {(row, column): value}
+    number_formats - {(row, column): format}, the cells must already be shown that way
+    """
+    number_formats = number_formats or {}
+    with zipfile.ZipFile(path) as archive:
+        part = sheet_part(archive, sheet_name)
+        styles = time_styles(archive)
+        xml = archive.read(part).decode("utf-8")
+
+        for (row, column), value in sorted(edits.items()):
+            xml = patch_cell(xml, f"{column_letter(column)}{row}", value, styles, number_formats.get((row, column)))
+        # Cached results of formulas are stale now, let the spreadsheet recompute them
+        xml, stripped = _FORMULA_VALUE.subn(r"\1", xml)
+        parts = {part: xml}
+        if stripped:
+            parts["xl/workbook.xml"] = recalc_on_load(archive.read("xl/workbook.xml").decode("utf-8"))
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".xlsx")
+        try:
+            with os.fdopen(fd, "wb") as f, zipfile.ZipFile(f, "w") as out:
+                for item in archive.infolist():
+                    data = parts[item.filename].encode("utf-8") if item.filename in parts else archive.read(item)
+                    out.writestr(item, data)
+            shutil.copymode(path, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise